@@ -35,6 +35,7 @@ class Manuscript:
         pdf_path (str): Path to the manuscript PDF
         processed_at (datetime): When the manuscript was processed
         text (str): Full text content of the manuscript
+        content_hash (str): Hash of the full text, used to detect re-uploads
     """
     
     def __init__(
@@ -50,7 +51,8 @@ class Manuscript:
         analysis_date: Optional[datetime] = None,
         pdf_path: str = "",
         processed_at: Optional[datetime] = None,
-        text: str = ""
+        text: str = "",
+        content_hash: str = ""
     ):
         """Initialize a new Manuscript instance.
         
@@ -67,6 +69,7 @@ class Manuscript:
             pdf_path: Path to the PDF file
             processed_at: When the manuscript was processed
             text: Full text content
+            content_hash: Hash of the full text
         """
         self.doi = doi
         self.title = title
@@ -80,6 +83,7 @@ class Manuscript:
         self.pdf_path = pdf_path
         self.processed_at = processed_at or datetime.now()
         self.text = text
+        self.content_hash = content_hash
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert the manuscript to a dictionary for database storage."""
@@ -95,7 +99,8 @@ class Manuscript:
             "analysis_date": self.analysis_date,
             "pdf_path": self.pdf_path,
             "processed_at": self.processed_at,
-            "text": self.text
+            "text": self.text,
+            "content_hash": self.content_hash
         }
     
     @classmethod
@@ -122,5 +127,6 @@ class Manuscript:
             analysis_date=data.get("analysis_date"),
             pdf_path=data.get("pdf_path", ""),
             processed_at=data.get("processed_at"),
-            text=data.get("text", "")
+            text=data.get("text", ""),
+            content_hash=data.get("content_hash", "")
         )
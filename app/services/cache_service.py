@@ -0,0 +1,255 @@
+"""
+Cache Service
+------------
+
+This module provides cached access to the database for the Streamlit pages.
+
+Streamlit re-runs the whole page script on every widget interaction, so
+read-only queries are wrapped in st.cache_data helpers keyed on the MongoDB
+URI, and the DatabaseService and analysis services are shared via
+st.cache_resource so the Mongo connection pool survives reruns.
+"""
+
+import time
+from typing import Dict, Any, List, Optional, Tuple
+import pandas as pd
+import streamlit as st
+from app.models.manuscript import Manuscript
+from app.models.compliance_result import ComplianceResult
+from app.models.feedback import Feedback
+from app.services.db_service import DatabaseService
+from app.services.metadata_extractor import MetadataExtractor
+from app.services.compliance_analyzer import ComplianceAnalyzer
+from app.services.summarize_service import SummarizeService
+
+# Time-to-live for cached query results in seconds
+CACHE_TTL = 300
+
+@st.cache_resource(show_spinner=False)
+def get_db_service(uri: str) -> DatabaseService:
+    """Get a DatabaseService shared across reruns and sessions.
+
+    Args:
+        uri: MongoDB connection string
+
+    Returns:
+        DatabaseService instance
+    """
+    return DatabaseService(uri)
+
+@st.cache_resource(show_spinner=False)
+def get_analysis_services(api_key: str, uri: str) -> Tuple[MetadataExtractor, ComplianceAnalyzer, SummarizeService]:
+    """Get the manuscript analysis services shared across reruns and sessions.
+
+    Args:
+        api_key: OpenAI API key
+        uri: MongoDB connection string
+
+    Returns:
+        Tuple of (MetadataExtractor, ComplianceAnalyzer, SummarizeService)
+    """
+    db_service = get_db_service(uri)
+    return (
+        MetadataExtractor(api_key),
+        ComplianceAnalyzer(api_key, db_service),
+        SummarizeService(api_key, db_service)
+    )
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_checklist_items(uri: str) -> List[Dict[str, Any]]:
+    """Load all checklist items.
+
+    Args:
+        uri: MongoDB connection string
+
+    Returns:
+        List of checklist item documents sorted by item_id
+    """
+    return get_db_service(uri).get_checklist_items()
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_checklist_groups(uri: str) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+    """Load checklist items grouped by category and original text.
+
+    Args:
+        uri: MongoDB connection string
+
+    Returns:
+        Dictionary mapping category to a dictionary mapping original text to
+        its checklist items, both in database order
+    """
+    # Group by category and original text in one pass, keeping database order
+    groups = {}
+    for item in load_checklist_items(uri):
+        category = item.get('category', 'Uncategorized')
+        original = item.get('original', '')
+        groups.setdefault(category, {}).setdefault(original, []).append(item)
+    return groups
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_checklist_index(uri: str) -> Dict[str, Any]:
+    """Load the checklist categories, sections and items per category.
+
+    Args:
+        uri: MongoDB connection string
+
+    Returns:
+        Dictionary containing:
+            - categories: Sorted list of category names
+            - sections: Sorted list of section names
+            - items_by_category: Dictionary mapping category to its original
+              text and its items sorted by question
+    """
+    # Collect categories, sections and grouped items in a single pass
+    categories = set()
+    sections = set()
+    items_by_category = {}
+    for item in load_checklist_items(uri):
+        cat = item.get('category', '')
+        section = item.get('section', '')
+        if cat:
+            categories.add(cat)
+        if section:
+            sections.add(section)
+        group = items_by_category.setdefault(cat, {
+            'original': item.get('original', ''),
+            'items': []
+        })
+        group['items'].append(item)
+    
+    for group in items_by_category.values():
+        group['items'].sort(key=lambda x: x.get('question', ''))
+    
+    return {
+        "categories": sorted(categories),
+        "sections": sorted(sections),
+        "items_by_category": items_by_category
+    }
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_manuscripts(uri: str) -> List[Manuscript]:
+    """Load all manuscripts without their full text.
+
+    Args:
+        uri: MongoDB connection string
+
+    Returns:
+        List of Manuscript objects with an empty text field
+    """
+    return get_db_service(uri).get_all_manuscripts(include_text=False)
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_manuscript_frame(uri: str) -> pd.DataFrame:
+    """Load the filterable fields of all manuscripts as a DataFrame.
+
+    Args:
+        uri: MongoDB connection string
+
+    Returns:
+        DataFrame with doi, discipline, design and processed_at columns
+    """
+    frame = pd.DataFrame(
+        [(m.doi, m.discipline, m.design, m.processed_at) for m in load_manuscripts(uri)],
+        columns=['doi', 'discipline', 'design', 'processed_at']
+    )
+    frame['processed_at'] = pd.to_datetime(frame['processed_at'])
+    return frame
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_compliance_results(uri: str, doi: str) -> List[ComplianceResult]:
+    """Load the compliance results of a manuscript.
+
+    Args:
+        uri: MongoDB connection string
+        doi: DOI of the manuscript
+
+    Returns:
+        List of ComplianceResult objects
+    """
+    return get_db_service(uri).get_compliance_results(doi)
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_summary(uri: str, doi: str) -> Optional[Dict[str, Any]]:
+    """Load the compliance summary of a manuscript.
+
+    Args:
+        uri: MongoDB connection string
+        doi: DOI of the manuscript
+
+    Returns:
+        Summary document if found, None otherwise
+    """
+    return get_db_service(uri).get_summary(doi)
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_feedback(uri: str, doi: str, user_email: Optional[str] = None) -> List[Feedback]:
+    """Load the feedback given on a manuscript.
+
+    Args:
+        uri: MongoDB connection string
+        doi: DOI of the manuscript
+        user_email: Optional email of the user to load feedback for
+
+    Returns:
+        List of Feedback objects
+    """
+    return get_db_service(uri).get_all_feedback(doi, user_email=user_email)
+
+@st.cache_data(show_spinner=False)
+def read_css(path: str, mtime: float) -> str:
+    """Read a stylesheet from disk.
+
+    Args:
+        path: Path to the CSS file
+        mtime: Modification time of the file, so edits invalidate the cache
+
+    Returns:
+        Contents of the CSS file
+    """
+    with open(path, 'r') as f:
+        return f.read()
+
+@st.cache_resource(show_spinner=False)
+def _data_version_counter() -> Dict[str, int]:
+    """Get the write counter shared across reruns and sessions."""
+    return {"version": 0}
+
+def get_data_version() -> Tuple[int, int]:
+    """Get the current data version.
+
+    The version changes after every write made through the app and at least
+    once per CACHE_TTL, so results derived from the cached loaders can be
+    memoized against it.
+
+    Returns:
+        Tuple of (write counter, TTL period)
+    """
+    return _data_version_counter()["version"], int(time.time() // CACHE_TTL)
+
+def bump_data_version():
+    """Mark all data derived from the database as stale."""
+    _data_version_counter()["version"] += 1
+
+def clear_checklist_cache():
+    """Invalidate cached checklist items after a checklist write."""
+    load_checklist_items.clear()
+    load_checklist_groups.clear()
+    load_checklist_index.clear()
+    bump_data_version()
+
+def clear_manuscript_cache():
+    """Invalidate cached manuscripts after a manuscript write."""
+    load_manuscripts.clear()
+    load_manuscript_frame.clear()
+    bump_data_version()
+
+def clear_analysis_cache():
+    """Invalidate cached compliance results and summaries after an analysis."""
+    load_compliance_results.clear()
+    load_summary.clear()
+    bump_data_version()
+
+def clear_feedback_cache():
+    """Invalidate cached feedback after a feedback write."""
+    load_feedback.clear()
+    bump_data_version()
@@ -7,7 +7,8 @@ with reproducibility guidelines using OpenAI's API.
 """
 
 import os
-from typing import Dict, Any, List
+import asyncio
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 import re
 import json
@@ -15,7 +16,21 @@ import time
 from ..models.manuscript import Manuscript
 from ..models.compliance_result import ComplianceResult
 from ..services.db_service import DatabaseService
-from .llm_service import get_llm_response, truncate_to_token_limit, MAX_TOKENS_INPUT
+from .llm_service import (
+    get_llm_response,
+    get_llm_response_async,
+    truncate_to_token_limit,
+    RateLimiter,
+    MAX_TOKENS_INPUT
+)
+
+SYSTEM_PROMPT = "You are a scientific manuscript analyzer that evaluates compliance with reporting guidelines. You output only valid JSON."
+
+# Number of checklist items answered by a single API call
+ITEMS_PER_REQUEST = 5
+
+# Output tokens reserved per checklist item in a batched call
+MAX_TOKENS_OUTPUT_PER_ITEM = 500
 
 class ComplianceAnalyzer:
     """A class for analyzing manuscript reproducibility compliance.
@@ -41,50 +56,90 @@ class ComplianceAnalyzer:
         self._load_prompt_template()
 
     def _load_prompt_template(self):
-        """Load the prompt template from file."""
+        """Load the prompt templates from file."""
         prompt_path = os.path.join('app', 'prompts', 'compliance_analysis.txt')
         with open(prompt_path, 'r') as f:
             self.prompt_template = f.read()
+        batch_prompt_path = os.path.join('app', 'prompts', 'compliance_analysis_batch.txt')
+        with open(batch_prompt_path, 'r') as f:
+            self.batch_prompt_template = f.read()
 
-    def analyze_item(self, manuscript: Manuscript, text: str, checklist_item: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze a single checklist item for compliance.
+    def _build_prompt(self, text: str, checklist_item: Dict[str, Any]) -> str:
+        """Format the analysis prompt for a checklist item.
         
         Args:
-            manuscript: Manuscript object containing metadata
             text: Text content to analyze
             checklist_item: Dictionary containing item details
             
         Returns:
-            Dictionary containing compliance analysis results
+            Prompt text
         """
         # Truncate text to fit within token limit if needed
         text_to_analyze = truncate_to_token_limit(text, MAX_TOKENS_INPUT)
         
         # Format prompt with item details and text
-        prompt = self.prompt_template.format(
+        return self.prompt_template.format(
             item=checklist_item,
             text=text_to_analyze
         )
+
+    def _parse_result(self, response_text: str, manuscript: Manuscript, checklist_item: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse an LLM response into a compliance result.
+        
+        Args:
+            response_text: JSON response from the LLM
+            manuscript: Manuscript object containing metadata
+            checklist_item: Dictionary containing item details
+            
+        Returns:
+            Dictionary containing compliance analysis results
+        """
+        # Parse response
+        return self._add_metadata(json.loads(response_text), manuscript, checklist_item)
+
+    def _add_metadata(self, result: Dict[str, Any], manuscript: Manuscript, checklist_item: Dict[str, Any]) -> Dict[str, Any]:
+        """Add item and manuscript metadata to a parsed compliance result.
+        
+        Args:
+            result: Parsed compliance result
+            manuscript: Manuscript object containing metadata
+            checklist_item: Dictionary containing item details
+            
+        Returns:
+            The result with metadata added
+        """
+        result["item_id"] = checklist_item["item_id"]
+        result["question"] = checklist_item["question"]
+        result["description"] = checklist_item["description"]
+        result["created_at"] = datetime.now()
+        result["doi"] = manuscript.doi
+        
+        return result
+
+    def analyze_item(self, manuscript: Manuscript, text: str, checklist_item: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze a single checklist item for compliance.
+        
+        Args:
+            manuscript: Manuscript object containing metadata
+            text: Text content to analyze
+            checklist_item: Dictionary containing item details
+            
+        Returns:
+            Dictionary containing compliance analysis results
+        """
+        prompt = self._build_prompt(text, checklist_item)
             
         # Call GPT-4 Turbo for analysis
         try:
             # Get response from LLM service
             response_text = get_llm_response(
                 prompt=prompt,
-                system_prompt="You are a scientific manuscript analyzer that evaluates compliance with reporting guidelines. You output only valid JSON.",
+                system_prompt=SYSTEM_PROMPT,
                 temperature=0,
                 max_tokens_output=2000  # Compliance analysis response should be relatively short
             )
             
-            # Parse response
-            result = json.loads(response_text)
-            
-            # Add metadata
-            result["item_id"] = checklist_item["item_id"]
-            result["question"] = checklist_item["question"]
-            result["description"] = checklist_item["description"]
-            result["created_at"] = datetime.now()
-            result["doi"] = manuscript.doi
+            result = self._parse_result(response_text, manuscript, checklist_item)
             
             # Add small delay between API calls to avoid rate limits
             time.sleep(1)
@@ -95,9 +150,178 @@ class ComplianceAnalyzer:
             print(f"Error during OpenAI API call: {str(e)}")
             raise
 
+    async def analyze_item_async(self, manuscript: Manuscript, text: str, checklist_item: Dict[str, Any],
+                                 rate_limiter: Optional[RateLimiter] = None) -> Dict[str, Any]:
+        """Analyze a single checklist item for compliance without blocking.
+        
+        Args:
+            manuscript: Manuscript object containing metadata
+            text: Text content to analyze
+            checklist_item: Dictionary containing item details
+            rate_limiter: Optional RateLimiter shared by concurrent calls
+            
+        Returns:
+            Dictionary containing compliance analysis results
+        """
+        prompt = self._build_prompt(text, checklist_item)
+        
+        try:
+            response_text = await get_llm_response_async(
+                prompt=prompt,
+                system_prompt=SYSTEM_PROMPT,
+                temperature=0,
+                max_tokens_output=2000,  # Compliance analysis response should be relatively short
+                rate_limiter=rate_limiter
+            )
+            return self._parse_result(response_text, manuscript, checklist_item)
+            
+        except Exception as e:
+            print(f"Error during OpenAI API call: {str(e)}")
+            raise
+
+    async def _analyze_item_with_retry(self, manuscript: Manuscript, text: str, item: Dict[str, Any],
+                                       rate_limiter: RateLimiter, errors: List[str]) -> Optional[Dict[str, Any]]:
+        """Analyze a checklist item, retrying once after a delay on failure.
+        
+        Args:
+            manuscript: Manuscript object containing metadata
+            text: Text content to analyze
+            item: Dictionary containing checklist item details
+            rate_limiter: RateLimiter shared by the concurrent API calls
+            errors: List that error messages are appended to
+            
+        Returns:
+            Dictionary containing compliance analysis results, or None if both attempts failed
+        """
+        try:
+            return await self.analyze_item_async(manuscript, text, item, rate_limiter)
+        except Exception as e:
+            error_msg = f"Error analyzing item {item['item_id']}: {str(e)}"
+            print(error_msg)
+            errors.append(error_msg)
+        
+        # Don't continue silently, try to reanalyze with a delay
+        print(f"Retrying analysis for item {item['item_id']} after delay...")
+        await asyncio.sleep(5)  # Wait 5 seconds before retry
+        try:
+            return await self.analyze_item_async(manuscript, text, item, rate_limiter)
+        except Exception as retry_e:
+            error_msg = f"Failed retry for item {item['item_id']}: {str(retry_e)}"
+            print(error_msg)
+            errors.append(error_msg)
+            return None
+
+    async def analyze_items_async(self, manuscript: Manuscript, text: str, checklist_items: List[Dict[str, Any]],
+                                  rate_limiter: Optional[RateLimiter] = None) -> Dict[str, Dict[str, Any]]:
+        """Analyze several checklist items with a single API call.
+        
+        The manuscript text is sent once for all items instead of once per item.
+        
+        Args:
+            manuscript: Manuscript object containing metadata
+            text: Text content to analyze
+            checklist_items: List of dictionaries containing checklist item details
+            rate_limiter: Optional RateLimiter shared by concurrent calls
+            
+        Returns:
+            Dictionary mapping item_id to its compliance result; items the
+            response did not cover are missing
+        """
+        items_text = "\n\n".join(
+            f"item_id: {item['item_id']}\nItem to check: {item['question']}\nDescription: {item['description']}"
+            for item in checklist_items
+        )
+        prompt = self.batch_prompt_template.format(
+            items=items_text,
+            text=truncate_to_token_limit(text, MAX_TOKENS_INPUT)
+        )
+        
+        response_text = await get_llm_response_async(
+            prompt=prompt,
+            system_prompt=SYSTEM_PROMPT,
+            temperature=0,
+            max_tokens_output=MAX_TOKENS_OUTPUT_PER_ITEM * len(checklist_items),
+            response_format={"type": "json_object"},
+            rate_limiter=rate_limiter
+        )
+        
+        answers = {
+            str(answer.get("item_id")): answer
+            for answer in json.loads(response_text).get("results", [])
+            if isinstance(answer, dict)
+        }
+        return {
+            item["item_id"]: self._add_metadata(answers[str(item["item_id"])], manuscript, item)
+            for item in checklist_items
+            if str(item["item_id"]) in answers
+        }
+
+    async def _analyze_batch(self, manuscript: Manuscript, text: str, checklist_items: List[Dict[str, Any]],
+                             rate_limiter: RateLimiter, errors: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Analyze a batch of checklist items, analyzing items one by one if the batch fails.
+        
+        Args:
+            manuscript: Manuscript object containing metadata
+            text: Text content to analyze
+            checklist_items: List of dictionaries containing checklist item details
+            rate_limiter: RateLimiter shared by the concurrent API calls
+            errors: List that error messages are appended to
+            
+        Returns:
+            Result (or None on failure) for each checklist item, in the same order
+        """
+        try:
+            results = await self.analyze_items_async(manuscript, text, checklist_items, rate_limiter)
+        except Exception as e:
+            error_msg = f"Error analyzing items {', '.join(str(item['item_id']) for item in checklist_items)}: {str(e)}"
+            print(error_msg)
+            errors.append(error_msg)
+            results = {}
+        
+        # Fall back to single-item analysis for items missing from the batch response
+        missing = [item for item in checklist_items if item["item_id"] not in results]
+        fallback = await asyncio.gather(*(
+            self._analyze_item_with_retry(manuscript, text, item, rate_limiter, errors)
+            for item in missing
+        ))
+        results.update((item["item_id"], result) for item, result in zip(missing, fallback))
+        
+        return [results[item["item_id"]] for item in checklist_items]
+
+    async def _analyze_items(self, manuscript: Manuscript, text: str, checklist_items: List[Dict[str, Any]],
+                             errors: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Analyze all checklist items in concurrent batches.
+        
+        Args:
+            manuscript: Manuscript object containing metadata
+            text: Text content to analyze
+            checklist_items: List of dictionaries containing checklist item details
+            errors: List that error messages are appended to
+            
+        Returns:
+            Result (or None on failure) for each checklist item, in the same order
+        """
+        rate_limiter = RateLimiter()
+        batches = [
+            checklist_items[i:i + ITEMS_PER_REQUEST]
+            for i in range(0, len(checklist_items), ITEMS_PER_REQUEST)
+        ]
+        try:
+            batch_results = await asyncio.gather(*(
+                self._analyze_batch(manuscript, text, batch, rate_limiter, errors)
+                for batch in batches
+            ))
+        finally:
+            await rate_limiter.aclose()
+        return [result for results in batch_results for result in results]
+
     def analyze_manuscript(self, manuscript: Manuscript, text: str, checklist_items: List[Dict[str, Any]], store_results: bool = True) -> List[Dict[str, Any]]:
         """Analyze a manuscript for compliance with all checklist items.
         
+        The checklist items are analyzed in concurrent batches of
+        ITEMS_PER_REQUEST items per API call, so the analysis takes roughly
+        as long as the slowest calls instead of their sum.
+        
         Args:
             manuscript: Manuscript object containing metadata
             text: Text content to analyze
@@ -107,50 +331,13 @@ class ComplianceAnalyzer:
         Returns:
             List of dictionaries containing compliance analysis results
         """
-        results = []
         errors = []
+        item_results = asyncio.run(self._analyze_items(manuscript, text, checklist_items, errors))
+        results = [result for result in item_results if result is not None]
         
-        for item in checklist_items:
-            try:
-                result = self.analyze_item(manuscript, text, item)
-                results.append(result)
-                
-                # Save to database if requested
-                if store_results:
-                    self.db_service.compliance_results.update_one(
-                        {
-                            "doi": manuscript.doi,
-                            "item_id": item["item_id"]
-                        },
-                        {"$set": result},
-                        upsert=True
-                    )
-                    
-            except Exception as e:
-                error_msg = f"Error analyzing item {item['item_id']}: {str(e)}"
-                print(error_msg)
-                errors.append(error_msg)
-                # Don't continue silently, try to reanalyze with a delay
-                try:
-                    print(f"Retrying analysis for item {item['item_id']} after delay...")
-                    time.sleep(5)  # Wait 5 seconds before retry
-                    result = self.analyze_item(manuscript, text, item)
-                    results.append(result)
-                    
-                    if store_results:
-                        self.db_service.compliance_results.update_one(
-                            {
-                                "doi": manuscript.doi,
-                                "item_id": item["item_id"]
-                            },
-                            {"$set": result},
-                            upsert=True
-                        )
-                except Exception as retry_e:
-                    error_msg = f"Failed retry for item {item['item_id']}: {str(retry_e)}"
-                    print(error_msg)
-                    errors.append(error_msg)
-                    continue
+        # Save to database if requested, all results in one bulk write
+        if store_results and results:
+            self.db_service.save_compliance_results(results, manuscript.doi)
                 
         if errors:
             print("Analysis completed with errors:")
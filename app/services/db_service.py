@@ -6,10 +6,10 @@ This module provides database functionality for storing and retrieving
 manuscript data, compliance results, and summaries.
 """
 
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
 from pymongo.database import Database
 from pymongo.collection import Collection
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterator
 from app.models.manuscript import Manuscript
 from app.models.compliance_result import ComplianceResult
 from app.models.checklist_item import ChecklistItem
@@ -18,6 +18,9 @@ from datetime import datetime, timezone, UTC
 from bson import ObjectId
 import re
 
+# Accepted email address format
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
 class DatabaseService:
     def __init__(self, uri: str):
         self.client = MongoClient(uri)
@@ -38,14 +41,14 @@ class DatabaseService:
         """Create database indexes."""
         # Manuscript collection indexes
         self.manuscripts.create_index("doi", unique=True)
+        self.manuscripts.create_index("content_hash")
         
         # Compliance results collection indexes
         self.compliance_results.create_index([("doi", 1), ("item_id", 1)], unique=True)
         self.compliance_results.create_index("created_at")
         
         # Checklist items collection indexes
-        self.checklist_items.create_index("item_id", unique=True)
-        self.checklist_items.create_index("category")
+        self._create_checklist_indexes()
         
         # New feedback indexes
         self.feedback.create_index([("doi", 1), ("item_id", 1)])
@@ -60,6 +63,11 @@ class DatabaseService:
         self.users.create_index("email", unique=True)
         self.users.create_index("created_at")
 
+    def _create_checklist_indexes(self):
+        """Create the checklist items collection indexes."""
+        self.checklist_items.create_index("item_id", unique=True)
+        self.checklist_items.create_index("category")
+
     def _validate_email(self, email: str) -> bool:
         """
         Validate email format using regex.
@@ -70,8 +78,7 @@ class DatabaseService:
         Returns:
             bool: True if email is valid, False otherwise
         """
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(pattern, email))
+        return bool(EMAIL_PATTERN.match(email))
 
     def save_user(self, email: str) -> bool:
         """
@@ -142,6 +149,30 @@ class DatabaseService:
         
         return data["doi"]
     
+    def update_manuscript_fields(self, updates: Dict[str, Dict[str, Any]],
+                                 increments: Optional[Dict[str, int]] = None) -> None:
+        """
+        Set fields on several manuscripts in one bulk write.
+        
+        Only the given fields are written, leaving the rest of each
+        document (including its full text) untouched.
+        
+        Args:
+            updates: Dictionary mapping DOI to the fields to set
+            increments: Optional counters to increment on every updated manuscript
+        """
+        if not updates:
+            return
+        
+        operations = []
+        for doi, fields in updates.items():
+            update = {"$set": fields}
+            if increments:
+                update["$inc"] = increments
+            operations.append(UpdateOne({"doi": doi}, update))
+        
+        self.manuscripts.bulk_write(operations, ordered=False)
+    
     def save_compliance_result(self, doi: str, result: Dict[str, Any]) -> None:
         """
         Save a single compliance result to the database.
@@ -178,9 +209,20 @@ class DatabaseService:
         if not self.manuscripts.find_one({"doi": doi}):
             raise ValueError(f"No manuscript found with DOI: {doi}")
         
-        # Save each result
+        # Upsert all results in a single unordered bulk write
+        operations = []
         for result in results:
-            self.save_compliance_result(doi, result)
+            result["doi"] = doi
+            if "created_at" not in result:
+                result["created_at"] = datetime.now(UTC)
+            operations.append(UpdateOne(
+                {"doi": doi, "item_id": result["item_id"]},
+                {"$set": result},
+                upsert=True
+            ))
+        
+        if operations:
+            self.compliance_results.bulk_write(operations, ordered=False)
     
     def save_checklist_item(self, item: Dict[str, Any]) -> str:
         """
@@ -262,9 +304,51 @@ class DatabaseService:
         
         return result.modified_count > 0
         
+    def clear_checklist_items(self) -> None:
+        """Remove all checklist items.
+        
+        Drops the collection instead of deleting item by item, then
+        recreates its indexes.
+        """
+        self.checklist_items.drop()
+        self._create_checklist_indexes()
+    
     def save_checklist_items(self, items: List[Dict[str, Any]]) -> None:
-        """Save multiple checklist items to the database."""
+        """Save multiple checklist items to the database in one bulk write.
+        
+        Items without an item_id are saved one by one after the bulk write,
+        since their ids are generated from the highest stored id and must not
+        collide with the explicit ids written in the batch.
+        """
+        now = datetime.now(UTC)
+        operations = []
+        items_without_id = []
         for item in items:
+            if 'item_id' not in item:
+                items_without_id.append(item)
+                continue
+            
+            # Add timestamps if not present
+            if 'created_at' not in item:
+                item['created_at'] = now
+            item['updated_at'] = now
+            
+            # Ensure required fields
+            required_fields = ['category', 'question', 'description', 'section']
+            missing_fields = [field for field in required_fields if field not in item]
+            if missing_fields:
+                raise ValueError(f"Missing required fields for item {item['item_id']}: {', '.join(missing_fields)}")
+            
+            operations.append(UpdateOne(
+                {"item_id": item["item_id"]},
+                {"$set": item},
+                upsert=True
+            ))
+        
+        if operations:
+            self.checklist_items.bulk_write(operations, ordered=False)
+        
+        for item in items_without_id:
             self.save_checklist_item(item)
     
     def get_checklist_items(self, category: str = None) -> List[Dict[str, Any]]:
@@ -291,6 +375,66 @@ class DatabaseService:
             print(f"Error getting compliance results: {str(e)}")
             return []
     
+    def get_checklist_stats(self, dois: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get compliance and feedback counts per checklist item for a set of manuscripts.
+
+        Counting and the feedback join are done server-side in a single
+        aggregation instead of fetching results and feedback separately.
+
+        Args:
+            dois: DOIs of the manuscripts to include
+
+        Returns:
+            Dictionary where key is item_id and value is a dictionary containing:
+                - Yes, No, Partial, n/a: Number of results with that compliance
+                - total: Total number of results for the item
+                - reviewed: Number of results with (non-skipped) user feedback
+                - agreed: Number of reviewed results the user agreed with
+        """
+        def count_if(condition):
+            return {"$sum": {"$cond": [condition, 1, 0]}}
+
+        review_status = {"$arrayElemAt": ["$feedback.review_status", 0]}
+        pipeline = [
+            {"$match": {"doi": {"$in": list(dois)}}},
+            # Attach the latest feedback on each result
+            {"$lookup": {
+                "from": self.feedback.name,
+                "let": {"doi": "$doi", "item_id": "$item_id"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$and": [
+                        {"$eq": ["$doi", "$$doi"]},
+                        {"$eq": ["$item_id", "$$item_id"]}
+                    ]}}},
+                    {"$sort": {"_id": -1}},
+                    {"$limit": 1},
+                    {"$project": {"_id": 0, "review_status": 1}}
+                ],
+                "as": "feedback"
+            }},
+            {"$group": {
+                "_id": "$item_id",
+                "Yes": count_if({"$eq": ["$compliance", "Yes"]}),
+                "No": count_if({"$eq": ["$compliance", "No"]}),
+                "Partial": count_if({"$eq": ["$compliance", "Partial"]}),
+                "n/a": count_if({"$eq": ["$compliance", "n/a"]}),
+                "total": {"$sum": 1},
+                "reviewed": count_if({"$and": [
+                    {"$gt": [{"$size": "$feedback"}, 0]},
+                    {"$ne": [review_status, "skipped"]}
+                ]}),
+                "agreed": count_if({"$eq": [review_status, "agreed"]})
+            }}
+        ]
+        try:
+            return {
+                doc.pop("_id"): doc
+                for doc in self.compliance_results.aggregate(pipeline, batchSize=10000)
+            }
+        except Exception as e:
+            print(f"Error getting checklist stats: {str(e)}")
+            return {}
+
     def get_manuscript(self, doi: str) -> Optional[Manuscript]:
         """
         Retrieve a manuscript by its DOI.
@@ -304,6 +448,19 @@ class DatabaseService:
         data = self.manuscripts.find_one({"doi": doi})
         return Manuscript.from_dict(data) if data else None
 
+    def find_manuscript_by_hash(self, content_hash: str) -> Optional[Manuscript]:
+        """
+        Retrieve a manuscript by the hash of its full text.
+        
+        Args:
+            content_hash: Hash of the manuscript text
+            
+        Returns:
+            Manuscript object without its text if found, None otherwise
+        """
+        data = self.manuscripts.find_one({"content_hash": content_hash}, {"text": 0})
+        return Manuscript.from_dict(data) if data else None
+
     def list_manuscripts(self) -> list:
         """
         List all manuscripts in the database.
@@ -313,15 +470,21 @@ class DatabaseService:
         """
         return list(self.manuscripts.find())
 
-    def get_all_manuscripts(self) -> List[Manuscript]:
+    def get_all_manuscripts(self, include_text: bool = True) -> List[Manuscript]:
         """Get all manuscripts from the database.
         
+        Args:
+            include_text: Whether to load the full text of each manuscript.
+                Listings should pass False, since the text is by far the
+                largest field and is only needed for (re)analysis.
+        
         Returns:
             List of Manuscript objects
         """
         try:
             manuscripts = []
-            cursor = self.manuscripts.find()
+            projection = None if include_text else {"text": 0}
+            cursor = self.manuscripts.find({}, projection)
             for doc in cursor:
                 manuscripts.append(Manuscript.from_dict(doc))
             return manuscripts
@@ -329,6 +492,37 @@ class DatabaseService:
             print(f"Error getting manuscripts: {str(e)}")
             return []
 
+    def iter_manuscripts(self, query: Optional[Dict[str, Any]] = None, batch_size: int = 50,
+                         projection: Optional[Dict[str, int]] = None) -> Iterator[Manuscript]:
+        """Iterate over manuscripts without loading them all into memory.
+        
+        The cursor does not time out, so callers may do slow work (such as
+        LLM calls) between manuscripts.
+        
+        Args:
+            query: Optional MongoDB filter
+            batch_size: Number of manuscripts fetched per round trip
+            projection: Optional MongoDB projection; fields left out get their
+                Manuscript defaults
+            
+        Yields:
+            Manuscript objects
+        """
+        with self.manuscripts.find(query or {}, projection, no_cursor_timeout=True).batch_size(batch_size) as cursor:
+            for doc in cursor:
+                yield Manuscript.from_dict(doc)
+
+    def count_manuscripts(self, query: Optional[Dict[str, Any]] = None) -> int:
+        """Count manuscripts matching a filter.
+        
+        Args:
+            query: Optional MongoDB filter
+            
+        Returns:
+            Number of matching manuscripts
+        """
+        return self.manuscripts.count_documents(query or {})
+
     def save_feedback(self, feedback: Feedback) -> None:
         """
         Save feedback to the database.
@@ -348,6 +542,32 @@ class DatabaseService:
         data = feedback.to_dict()
         self.feedback.insert_one(data)
 
+    def save_feedback_many(self, feedback_list: List[Feedback]) -> None:
+        """
+        Save several feedback entries to the database in one insert.
+        
+        The manuscripts and users are verified once each instead of once
+        per feedback entry.
+        
+        Args:
+            feedback_list: Feedback objects to save
+        """
+        if not feedback_list:
+            return
+        
+        # Verify manuscripts exist
+        for doi in {feedback.doi for feedback in feedback_list}:
+            if not self.manuscripts.find_one({"doi": doi}):
+                raise ValueError(f"No manuscript found with DOI: {doi}")
+        
+        # Verify users exist if emails are provided
+        for email in {feedback.user_email for feedback in feedback_list if feedback.user_email}:
+            if not self.users.find_one({"email": email}):
+                raise ValueError(f"No user found with email: {email}")
+        
+        # Save feedback
+        self.feedback.insert_many([feedback.to_dict() for feedback in feedback_list])
+
     def get_feedback(self, doi: str, item_id: str, user_email: Optional[str] = None) -> Optional[Feedback]:
         """Get feedback for a specific compliance result.
         
@@ -393,26 +613,6 @@ class DatabaseService:
             print(f"Error getting all feedback: {str(e)}")
             return []
 
-    def get_all_feedback_by_item(self) -> Dict[str, List[Feedback]]:
-        """Get all feedback grouped by item_id.
-        
-        Returns:
-            Dictionary where key is item_id and value is list of Feedback instances
-        """
-        try:
-            feedback_by_item = {}
-            # Get all feedback in a single query
-            cursor = self.feedback.find()
-            for feedback_dict in cursor:
-                feedback = Feedback.from_dict(feedback_dict)
-                if feedback.item_id not in feedback_by_item:
-                    feedback_by_item[feedback.item_id] = []
-                feedback_by_item[feedback.item_id].append(feedback)
-            return feedback_by_item
-        except Exception as e:
-            print(f"Error getting all feedback by item: {str(e)}")
-            return {}
-
     def get_feedback_by_user(self, email: str) -> List[Dict[str, Any]]:
         """
         Get all feedback by a specific user.
@@ -7,9 +7,19 @@ text analysis and generation tasks.
 """
 
 import os
+import time
+import random
+import asyncio
 import logging
-from openai import OpenAI
-from typing import Dict, Any, List
+from openai import (
+    OpenAI,
+    AsyncOpenAI,
+    RateLimitError,
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError
+)
+from typing import Dict, Any, List, Optional
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,6 +31,132 @@ MAX_TOKENS_INPUT = 100000  # Reserve ~100K for input
 MAX_TOKENS_OUTPUT = 4000   # Reserve 4K for output
 CHARS_PER_TOKEN = 4        # Approximate characters per token
 
+DEFAULT_SYSTEM_PROMPT = "You are a helpful assistant that analyzes scientific manuscripts for reproducibility compliance."
+
+# Rate limiting of async API calls
+MAX_CONCURRENT_REQUESTS = 8   # Maximum number of API calls in flight
+MAX_RATE_LIMIT_RETRIES = 6    # Attempts per call on 429s and transient errors
+MAX_RETRY_DELAY = 60          # Upper bound for the exponential backoff in seconds
+
+# Errors retried by get_llm_response_async. The client's own retries are
+# disabled so that every attempt goes through the rate limiter
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+
+class RateLimiter:
+    """Limits concurrent OpenAI API calls and their token throughput.
+    
+    Concurrency is bounded by a semaphore. The tokens-per-minute budget is
+    learned from the x-ratelimit-* response headers and refilled linearly,
+    so calls only wait when the account limit is close to being reached.
+    
+    The limiter also holds the AsyncOpenAI client used by the calls going
+    through it, so they share one connection pool. A RateLimiter binds to the
+    event loop it is first used in, so create one per asyncio.run and close
+    it with aclose when done.
+    """
+    
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_REQUESTS):
+        """Initialize the rate limiter.
+        
+        Args:
+            max_concurrent: Maximum number of API calls in flight
+        """
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._limit_tokens = None
+        self._remaining_tokens = None
+        self._updated_at = time.monotonic()
+        self._client = None
+    
+    def client(self, api_key: str) -> AsyncOpenAI:
+        """Get the client shared by the calls going through this limiter.
+        
+        Args:
+            api_key: OpenAI API key, used when the client is first created
+            
+        Returns:
+            AsyncOpenAI client without built-in retries, since retries are
+            handled by get_llm_response_async
+        """
+        if self._client is None:
+            self._client = AsyncOpenAI(api_key=api_key, max_retries=0)
+        return self._client
+    
+    async def aclose(self):
+        """Close the shared client and its connection pool."""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+    
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        self._semaphore.release()
+    
+    def _available_tokens(self) -> Optional[float]:
+        """Estimate the tokens currently available, None if the budget is unknown."""
+        if self._limit_tokens is None or self._remaining_tokens is None:
+            return None
+        refill = (time.monotonic() - self._updated_at) * self._limit_tokens / 60
+        return min(self._limit_tokens, self._remaining_tokens + refill)
+    
+    async def wait_for_tokens(self, tokens: int):
+        """Wait until the token budget allows a call and reserve its tokens.
+        
+        Args:
+            tokens: Estimated tokens used by the call
+        """
+        available = self._available_tokens()
+        while available is not None:
+            # A call larger than the whole budget only waits for a full budget
+            needed = min(tokens, self._limit_tokens)
+            if available >= needed:
+                break
+            await asyncio.sleep((needed - available) * 60 / self._limit_tokens)
+            available = self._available_tokens()
+        
+        if available is not None:
+            self._remaining_tokens = available - tokens
+            self._updated_at = time.monotonic()
+    
+    def update(self, headers):
+        """Update the token budget from API response headers.
+        
+        Args:
+            headers: Response headers containing x-ratelimit-* values
+        """
+        try:
+            limit = headers.get('x-ratelimit-limit-tokens')
+            remaining = headers.get('x-ratelimit-remaining-tokens')
+            if limit and remaining:
+                self._limit_tokens = int(limit)
+                self._remaining_tokens = int(remaining)
+                self._updated_at = time.monotonic()
+        except (TypeError, ValueError):
+            logger.warning("Could not parse rate limit headers")
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """
+    Get the delay before retrying a rate limited or failed call.
+    
+    Honors the retry-after header when present, otherwise backs off
+    exponentially with jitter.
+    
+    Args:
+        error: Retryable error raised by the API call
+        attempt: Number of the failed attempt, starting from 0
+        
+    Returns:
+        Delay in seconds
+    """
+    response = getattr(error, 'response', None)
+    retry_after = getattr(response, 'headers', {}).get('retry-after')
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return min(MAX_RETRY_DELAY, 2 ** attempt) + random.uniform(0, 1)
+
 def estimate_tokens(text: str) -> int:
     """
     Estimate the number of tokens in a text.
@@ -54,9 +190,99 @@ def truncate_to_token_limit(text: str, max_tokens: int = MAX_TOKENS_INPUT) -> st
     max_chars = max_tokens * CHARS_PER_TOKEN
     return text[-max_chars:]
 
+def _get_api_key() -> str:
+    """Get the OpenAI API key from the environment."""
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        logger.error("OpenAI API key not found in environment variables")
+        raise ValueError("OpenAI API key not found in environment variables")
+    return api_key
+
+def _build_completion_args(
+    prompt: str,
+    system_prompt: str,
+    temperature: float,
+    max_tokens_output: int,
+    functions: List[Dict[str, Any]] = None,
+    function_call: Dict[str, str] = None,
+    response_format: Dict[str, str] = None
+) -> Dict[str, Any]:
+    """
+    Build the chat completion arguments for a prompt.
+    
+    Args:
+        See get_llm_response
+        
+    Returns:
+        Keyword arguments for chat.completions.create
+    """
+    # Truncate prompt if needed
+    logger.info("Preparing prompt")
+    max_prompt_tokens = MAX_TOKENS_TOTAL - len(system_prompt) // CHARS_PER_TOKEN - max_tokens_output
+    truncated_prompt = truncate_to_token_limit(prompt, max_prompt_tokens)
+    
+    # Prepare messages
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": truncated_prompt}
+    ]
+    
+    # Prepare API call arguments
+    logger.info("Creating chat completion arguments")
+    completion_args = {
+        "model": "gpt-4-turbo-preview",
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens_output
+    }
+    
+    # Add functions if provided
+    if functions:
+        completion_args["tools"] = [{"type": "function", "function": f} for f in functions]
+    if function_call:
+        completion_args["tool_choice"] = {"type": "function", "function": function_call}
+    if response_format:
+        completion_args["response_format"] = response_format
+    
+    # Print input for debugging
+    print("\nLLM Input:")
+    print("-" * 80)
+    for msg in messages:
+        print(f"{msg['role'].upper()}: {msg['content'][:500]}...")
+    print("-" * 80)
+    
+    return completion_args
+
+def _extract_content(response, functions: List[Dict[str, Any]] = None) -> str:
+    """
+    Extract the response text from a chat completion.
+    
+    Args:
+        response: Chat completion returned by the API
+        functions: Function definitions the completion was requested with
+        
+    Returns:
+        Direct content or function call arguments
+    """
+    logger.info("Processing API response")
+    if functions and response.choices[0].message.tool_calls:
+        # Return function call arguments
+        content = response.choices[0].message.tool_calls[0].function.arguments
+    else:
+        logger.info("Extracting message content")
+        content = response.choices[0].message.content
+
+    # Print response for debugging
+    print("\nLLM Response:")
+    print("-" * 80)
+    print(content)
+    print("-" * 80)
+
+    return content
+
 def get_llm_response(
     prompt: str,
-    system_prompt: str = "You are a helpful assistant that analyzes scientific manuscripts for reproducibility compliance.",
+    system_prompt: str = DEFAULT_SYSTEM_PROMPT,
     temperature: float = 0,
     max_tokens_output: int = MAX_TOKENS_OUTPUT,
     functions: List[Dict[str, Any]] = None,
@@ -78,74 +304,107 @@ def get_llm_response(
     Returns:
         The API's response text, either direct content or function call result
     """
-    # Get API key from environment
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        logger.error("OpenAI API key not found in environment variables")
-        raise ValueError("OpenAI API key not found in environment variables")
+    api_key = _get_api_key()
     
     try:
         # Initialize client with just API key
         logger.info("Initializing OpenAI client")
         client = OpenAI(api_key=api_key)
         
-        # Truncate prompt if needed
-        logger.info("Preparing prompt")
-        max_prompt_tokens = MAX_TOKENS_TOTAL - len(system_prompt) // CHARS_PER_TOKEN - max_tokens_output
-        truncated_prompt = truncate_to_token_limit(prompt, max_prompt_tokens)
-        
-        # Prepare messages
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": truncated_prompt}
-        ]
-        
-        # Prepare API call arguments
-        logger.info("Creating chat completion arguments")
-        completion_args = {
-            "model": "gpt-4-turbo-preview",
-            "messages": messages,
-            "temperature": temperature,
-            "max_tokens": max_tokens_output
-        }
-        
-        # Add functions if provided
-        if functions:
-            completion_args["tools"] = [{"type": "function", "function": f} for f in functions]
-        if function_call:
-            completion_args["tool_choice"] = {"type": "function", "function": function_call}
-        if response_format:
-            completion_args["response_format"] = response_format
+        completion_args = _build_completion_args(
+            prompt, system_prompt, temperature, max_tokens_output,
+            functions, function_call, response_format
+        )
         
         # Make API call
         logger.info("Making API call to OpenAI")
         try:
-            # Print input for debugging
-            print("\nLLM Input:")
-            print("-" * 80)
-            for msg in messages:
-                print(f"{msg['role'].upper()}: {msg['content'][:500]}...")
-            print("-" * 80)
-
             response = client.chat.completions.create(**completion_args)
             logger.info("API call successful")
+            return _extract_content(response, functions)
+            
+        except Exception as e:
+            logger.error(f"API call failed: {type(e).__name__}: {str(e)}")
+            if hasattr(e, 'response'):
+                logger.error(f"API response: {e.response}")
+            raise Exception(f"OpenAI API call failed: {str(e)}")
+        
+    except Exception as e:
+        logger.error(f"LLM service error: {type(e).__name__}: {str(e)}")
+        if hasattr(e, '__traceback__'):
+            logger.error("Traceback:", exc_info=True)
+        raise Exception(f"Error getting LLM response: {str(e)}")
+
+async def get_llm_response_async(
+    prompt: str,
+    system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+    temperature: float = 0,
+    max_tokens_output: int = MAX_TOKENS_OUTPUT,
+    functions: List[Dict[str, Any]] = None,
+    function_call: Dict[str, str] = None,
+    response_format: Dict[str, str] = None,
+    rate_limiter: Optional[RateLimiter] = None
+) -> str:
+    """
+    Get a response from OpenAI's API without blocking the event loop.
+    
+    Async variant of get_llm_response, so that many prompts can be in
+    flight at once with asyncio.gather. Calls go through a RateLimiter and
+    are retried with backoff when the API answers 429 or fails transiently
+    (connection errors, timeouts and 5xx responses).
+    
+    Args:
+        See get_llm_response
+        rate_limiter: Optional RateLimiter shared by concurrent calls
+        
+    Returns:
+        The API's response text, either direct content or function call result
+    """
+    api_key = _get_api_key()
+    
+    try:
+        completion_args = _build_completion_args(
+            prompt, system_prompt, temperature, max_tokens_output,
+            functions, function_call, response_format
+        )
+        
+        # A limiter created here only serves this call, so its client is closed afterwards
+        owns_rate_limiter = rate_limiter is None
+        rate_limiter = rate_limiter or RateLimiter()
+        client = rate_limiter.client(api_key)
+        
+        # Estimate from the messages actually sent, after truncation
+        estimated_tokens = sum(
+            estimate_tokens(message["content"]) for message in completion_args["messages"]
+        ) + max_tokens_output
+        
+        # Make API call
+        logger.info("Making async API call to OpenAI")
+        try:
+            # Retries are handled here so they can honor the rate limiter
+            try:
+                for attempt in range(MAX_RATE_LIMIT_RETRIES):
+                    async with rate_limiter:
+                        await rate_limiter.wait_for_tokens(estimated_tokens)
+                        try:
+                            raw_response = await client.chat.completions.with_raw_response.create(**completion_args)
+                        except RETRYABLE_ERRORS as e:
+                            if attempt == MAX_RATE_LIMIT_RETRIES - 1:
+                                raise
+                            delay = _retry_delay(e, attempt)
+                            reason = type(e).__name__
+                        else:
+                            rate_limiter.update(raw_response.headers)
+                            break
+                    
+                    logger.warning(f"{reason}, retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+            finally:
+                if owns_rate_limiter:
+                    await rate_limiter.aclose()
             
-            # Process response
-            logger.info("Processing API response")
-            if functions and response.choices[0].message.tool_calls:
-                # Return function call arguments
-                content = response.choices[0].message.tool_calls[0].function.arguments
-            else:
-                logger.info("Extracting message content")
-                content = response.choices[0].message.content
-
-            # Print response for debugging
-            print("\nLLM Response:")
-            print("-" * 80)
-            print(content)
-            print("-" * 80)
-
-            return content
+            logger.info("API call successful")
+            return _extract_content(raw_response.parse(), functions)
             
         except Exception as e:
             logger.error(f"API call failed: {type(e).__name__}: {str(e)}")
@@ -2,6 +2,12 @@ from pdfminer.high_level import extract_text
 from pathlib import Path
 from typing import Optional
 
+# PyMuPDF is much faster than PDFMiner; fall back to PDFMiner when it is not installed
+try:
+    import fitz
+except ImportError:
+    fitz = None
+
 class PDFExtractor:
     # Map of problematic Unicode characters to their ASCII equivalents
     CHAR_REPLACEMENTS = {
@@ -17,6 +23,20 @@ class PDFExtractor:
         '\u00a0': ' ',  # Non-breaking space
     }
 
+    @staticmethod
+    def _extract_text_pymupdf(pdf_path: str) -> str:
+        """
+        Extract text from a PDF file with PyMuPDF.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            
+        Returns:
+            Text of all pages in reading order
+        """
+        with fitz.open(pdf_path) as doc:
+            return "\n".join(page.get_text("text") for page in doc)
+
     @staticmethod
     def extract_text(pdf_path: str, max_chars: Optional[int] = None) -> str:
         """
@@ -33,8 +53,10 @@ class PDFExtractor:
             if not Path(pdf_path).exists():
                 raise FileNotFoundError(f"PDF file not found: {pdf_path}")
             
-            # Extract text with PDFMiner
-            text = extract_text(pdf_path)
+            # Extract text with PyMuPDF, falling back to PDFMiner if it finds no text
+            text = PDFExtractor._extract_text_pymupdf(pdf_path) if fitz else ""
+            if not text.strip():
+                text = extract_text(pdf_path)
             
             # Replace problematic characters with ASCII equivalents
             for unicode_char, ascii_char in PDFExtractor.CHAR_REPLACEMENTS.items():
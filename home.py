@@ -22,19 +22,24 @@ st.set_page_config(
 
 import os
 from app.services.pdf_extractor import PDFExtractor
-from app.services.metadata_extractor import MetadataExtractor
-from app.services.db_service import DatabaseService
-from app.services.compliance_analyzer import ComplianceAnalyzer
-from app.services.summarize_service import SummarizeService
+from app.services.cache_service import (
+    clear_manuscript_cache,
+    clear_analysis_cache,
+    read_css,
+    get_db_service,
+    get_analysis_services
+)
 from app.models.manuscript import Manuscript
 from app.models.compliance_result import ComplianceResult
 from app.models.feedback import Feedback
 from datetime import datetime
 import tempfile
+import shutil
+import hashlib
 
 # Load custom CSS
-with open('static/styles.css') as f:
-    st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
+css_file = 'static/styles.css'
+st.markdown(f'<style>{read_css(css_file, os.path.getmtime(css_file))}</style>', unsafe_allow_html=True)
 
 # Initialize services
 api_key = st.secrets["OPENAI_API_KEY"]
@@ -42,17 +47,18 @@ if not api_key:
     st.error("OpenAI API key not found in secrets!")
     st.stop()
 
-db_service = DatabaseService(st.secrets["MONGODB_URI"])
-metadata_extractor = MetadataExtractor(api_key)
-compliance_analyzer = ComplianceAnalyzer(api_key, db_service)
-summarize_service = SummarizeService(api_key, db_service)
+db_service = get_db_service(st.secrets["MONGODB_URI"])
+metadata_extractor, compliance_analyzer, summarize_service = get_analysis_services(
+    api_key, st.secrets["MONGODB_URI"]
+)
 
 def process_uploaded_file(uploaded_file):
     """Process uploaded PDF file."""
     try:
         # Create temporary file
         with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
+            uploaded_file.seek(0)
+            shutil.copyfileobj(uploaded_file, tmp_file, length=1024 * 1024)
             tmp_file_path = tmp_file.name
 
         # Extract text from PDF
@@ -63,6 +69,16 @@ def process_uploaded_file(uploaded_file):
             st.error("Could not extract text from the PDF. Please ensure the file is not corrupted or password protected.")
             return None
 
+        # Skip the analysis if the same text was already fully analyzed
+        # (the summary is saved last, so its presence means all stages ran)
+        content_hash = hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+        existing = db_service.find_manuscript_by_hash(content_hash)
+        if existing and db_service.get_summary(existing.doi):
+            os.unlink(tmp_file_path)
+            st.session_state.current_manuscript = existing
+            st.info(f"This manuscript has already been analyzed: {existing.title}")
+            return existing
+
         # Extract metadata
         metadata = metadata_extractor.extract_metadata(text)
         if not metadata:
@@ -79,11 +95,13 @@ def process_uploaded_file(uploaded_file):
             discipline=metadata.get('discipline', ''),
             email=metadata.get('email', ''),
             text=text,
+            content_hash=content_hash,
             processed_at=datetime.now()
         )
 
         # Save manuscript to database
         db_service.save_manuscript(manuscript)
+        clear_manuscript_cache()
 
         # Run compliance analysis
         checklist_items = db_service.get_checklist_items()
@@ -92,7 +110,8 @@ def process_uploaded_file(uploaded_file):
                 results = compliance_analyzer.analyze_manuscript(
                     manuscript=manuscript,
                     text=text,
-                    checklist_items=checklist_items
+                    checklist_items=checklist_items,
+                    store_results=False
                 )
                 if not results:
                     st.error("Could not analyze manuscript compliance. No results were generated.")
@@ -102,8 +121,8 @@ def process_uploaded_file(uploaded_file):
                     st.warning(f"⚠️ Analysis completed but only {len(results)} out of {len(checklist_items)} items were analyzed successfully. Some items may need to be reanalyzed.")
 
                 # Save results to database
-                for result in results:
-                    db_service.save_compliance_result(doi=manuscript.doi, result=result)
+                db_service.save_compliance_results(results, doi=manuscript.doi)
+                clear_analysis_cache()
 
         except Exception as e:
             st.error(f"Error during compliance analysis: {str(e)}")
@@ -119,6 +138,7 @@ def process_uploaded_file(uploaded_file):
                 overview=overview,
                 category_summaries=category_summaries
             )
+            clear_analysis_cache()
         else:
             st.warning("Could not generate complete summary. Some information may be missing.")
 
@@ -22,13 +22,10 @@ st.set_page_config(
 
 import os
 from app.services.pdf_extractor import PDFExtractor
-from app.services.metadata_extractor import MetadataExtractor
-from app.services.db_service import DatabaseService
-from app.services.compliance_analyzer import ComplianceAnalyzer
-from app.services.summarize_service import SummarizeService
 from app.models.manuscript import Manuscript
 from app.models.compliance_result import ComplianceResult
 from app.models.feedback import Feedback
+from app.services.cache_service import read_css, get_db_service, load_manuscripts
 from pages.views.results_view import compliance_analysis_page
 import json
 from datetime import datetime
@@ -36,19 +33,14 @@ import tempfile
 import pandas as pd
 
 # Load custom CSS
-with open('static/styles.css') as f:
-    st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
+css_file = 'static/styles.css'
+st.markdown(f'<style>{read_css(css_file, os.path.getmtime(css_file))}</style>', unsafe_allow_html=True)
 
-# Initialize services
-api_key = st.secrets["OPENAI_API_KEY"]
-if not api_key:
-    st.error("OpenAI API key not found in secrets!")
-    st.stop()
+# Maximum number of manuscripts listed in the selector
+MAX_SELECTOR_OPTIONS = 50
 
-db_service = DatabaseService(st.secrets["MONGODB_URI"])
-metadata_extractor = MetadataExtractor(api_key)
-compliance_analyzer = ComplianceAnalyzer(api_key, db_service)
-summarize_service = SummarizeService(api_key, db_service)
+# Initialize services (shared across reruns)
+db_service = get_db_service(st.secrets["MONGODB_URI"])
 
 # Initialize session state
 if 'current_manuscript' not in st.session_state:
@@ -78,17 +70,18 @@ def get_error_details(e: Exception) -> str:
     """Get detailed error information."""
     error_type = type(e).__name__
     error_msg = str(e)
-    if hasattr(e, 'response'):
-        if hasattr(e.response, 'text'):
-            error_msg += f"\nResponse: {e.response.text}"
+    response = getattr(e, 'response', None)
+    response_text = getattr(response, 'text', None)
+    if response_text:
+        error_msg += f"\nResponse: {response_text}"
     return f"{error_type}: {error_msg}"
 
 def display_manuscript_selector():
     """Display a list of analyzed manuscripts and allow selection."""
     st.markdown('<h2 class="section-title"> Current manuscript </h2>', unsafe_allow_html=True)
     
-    # Get list of analyzed manuscripts
-    manuscripts = db_service.get_all_manuscripts()
+    # Get list of analyzed manuscripts (cached across reruns)
+    manuscripts = load_manuscripts(st.secrets["MONGODB_URI"])
     
     if not manuscripts:
         st.info("No analyzed manuscripts found. Please upload a manuscript first.")
@@ -106,14 +99,6 @@ def display_manuscript_selector():
         st.success(f"📖: {st.session_state.current_manuscript.title}")
        
     
-    # Initialize index based on current selection
-    current_index = 0
-    if st.session_state.current_manuscript:
-        try:
-            current_index = manuscripts.index(st.session_state.current_manuscript)
-        except ValueError:
-            current_index = 0
-    
     st.write("---")
     st.markdown(f'<h2 class="section-title"> Select manuscript ({len(manuscripts)} analyzed) </h2>', unsafe_allow_html=True)
     
@@ -139,6 +124,19 @@ def display_manuscript_selector():
                          search_term in m.title.lower() or 
                          (hasattr(m, 'doi') and search_term in m.doi.lower())]
     
+    # Only ship the most recent matches to the browser
+    if len(manuscripts) > MAX_SELECTOR_OPTIONS:
+        st.caption(f"Showing the {MAX_SELECTOR_OPTIONS} most recent of {len(manuscripts)} manuscripts. Use the filters to narrow down.")
+        manuscripts = manuscripts[:MAX_SELECTOR_OPTIONS]
+    
+    # Initialize index based on current selection among the listed manuscripts
+    current_index = 0
+    if st.session_state.current_manuscript:
+        try:
+            current_index = manuscripts.index(st.session_state.current_manuscript)
+        except ValueError:
+            current_index = 0
+    
     # Create a selection box with a clear format
     manuscript_options = [f"{m.title} ({m.doi})" for m in manuscripts]
     
@@ -172,7 +170,7 @@ def main():
         
     # Initialize database service if not exists
     if 'db_service' not in st.session_state:
-        st.session_state.db_service = DatabaseService(st.secrets["MONGODB_URI"])
+        st.session_state.db_service = get_db_service(st.secrets["MONGODB_URI"])
     
     st.markdown("""
         <div style="display: flex; justify-content: space-between; align-items: baseline;">
@@ -184,26 +182,22 @@ def main():
     if 'active_tab' not in st.session_state:
         st.session_state.active_tab = "Select manuscript"
     
-    # Create tabs for different views
+    # Select the view with a tab-styled radio, since st.tabs runs the body
+    # of every tab on each rerun and only the active view should be rendered
     tabs = ["Select manuscript", "View Results"]
-    tab1, tab2 = st.tabs(tabs)
+    active_tab = st.radio("View", tabs, key="active_tab", horizontal=True, label_visibility="collapsed")
     
-    # Set active tab if changed
-    active_tab_index = tabs.index(st.session_state.active_tab)
-    
-    with tab1:
+    if active_tab == "Select manuscript":
         display_manuscript_selector()
-    
-    with tab2:
-        if st.session_state.current_manuscript:
-            st.markdown('<h2 class="section-title">Analysis Results</h2>', unsafe_allow_html=True)
-            compliance_analysis_page()
-        else:
-            st.markdown("""
-                <div class="ai-insight">
-                    Please select a manuscript first to view analysis results.
-                </div>
-            """, unsafe_allow_html=True)
+    elif st.session_state.current_manuscript:
+        st.markdown('<h2 class="section-title">Analysis Results</h2>', unsafe_allow_html=True)
+        compliance_analysis_page()
+    else:
+        st.markdown("""
+            <div class="ai-insight">
+                Please select a manuscript first to view analysis results.
+            </div>
+        """, unsafe_allow_html=True)
 
 if __name__ == "__main__":
     main()
@@ -10,45 +10,69 @@ Author: ReproAI Team
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from app.services.db_service import DatabaseService
+from app.services.cache_service import (
+    CACHE_TTL,
+    get_db_service,
+    load_checklist_groups,
+    load_manuscript_frame,
+    read_css,
+    get_data_version
+)
 from pages.views.checklist_manage_view import manage_checklist_items
 from pages.views.checklist_stats_view import (
-    calculate_compliance_score, 
-    format_compliance_status, 
-    calculate_accuracy,
-    get_unique_values,
-    get_stats_by_field,
-    filter_manuscripts
+    build_compliance_stats,
+    color_scores,
+    get_unique_column_values,
+    filter_manuscript_dois
 )
 import os
+from html import escape
 
 # Load CSS
 def load_css():
     """Load custom CSS styles."""
     css_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static', 'styles.css')
-    with open(css_file, 'r') as f:
-        st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
+    css = read_css(css_file, os.path.getmtime(css_file))
+    st.markdown(f'<style>{css}</style>', unsafe_allow_html=True)
 
-def display_filter_sidebar(manuscripts):
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def get_filter_options(uri: str, data_version: tuple) -> dict:
+    """Get the filter choices offered for the manuscripts.
+    
+    Cached like render_checklist_html, so the manuscripts are only scanned
+    again after the data changed.
+    """
+    manuscripts = load_manuscript_frame(uri)
+    
+    # Get min and max dates from manuscripts
+    min_date, max_date = manuscripts['processed_at'].agg(['min', 'max'])
+    if pd.isna(min_date):
+        min_date = max_date = datetime.now()
+    
+    return {
+        "disciplines": get_unique_column_values(manuscripts, 'discipline'),
+        "designs": get_unique_column_values(manuscripts, 'design'),
+        "min_date": min_date,
+        "max_date": max_date
+    }
+
+def display_filter_sidebar(options: dict):
     """Display filter controls in the sidebar."""
     st.sidebar.markdown("## Filter Manuscripts")
     
     # Discipline filter
-    disciplines = ["All"] + get_unique_values(manuscripts, 'discipline')
+    disciplines = ["All"] + options["disciplines"]
     selected_discipline = st.sidebar.selectbox("Discipline", disciplines)
     
     # Design filter
-    designs = ["All"] + get_unique_values(manuscripts, 'design')
+    designs = ["All"] + options["designs"]
     selected_design = st.sidebar.selectbox("Study Design", designs)
     
     # Date range filter
     st.sidebar.markdown("### Processing Date Range")
     
-    # Get min and max dates from manuscripts
-    dates = [m.processed_at for m in manuscripts if m.processed_at]
-    min_date = min(dates) if dates else datetime.now()
-    max_date = max(dates) if dates else datetime.now()
-    
+    min_date = options["min_date"]
+    max_date = options["max_date"]
     start_date = st.sidebar.date_input("From", min_date)
     end_date = st.sidebar.date_input("To", max_date)
     
@@ -59,23 +83,109 @@ def display_filter_sidebar(manuscripts):
     if selected_design != "All":
         filters['design'] = selected_design
     
-    # Convert dates to datetime
-    filters['processed_after'] = datetime.combine(start_date, datetime.min.time())
-    filters['processed_before'] = datetime.combine(end_date, datetime.max.time())
+    # Convert dates to datetime, skipping bounds that cover all manuscripts
+    if start_date > min_date.date():
+        filters['processed_after'] = datetime.combine(start_date, datetime.min.time())
+    if end_date < max_date.date():
+        filters['processed_before'] = datetime.combine(end_date, datetime.max.time())
     
     return filters
 
-def display_stats_summary(manuscripts, filters):
-    """Display summary statistics based on current filters."""
+def display_stats_summary(filtered_dois):
+    """Display summary statistics for the filtered manuscripts."""
     st.sidebar.markdown("## Summary Statistics")
     
-    # Filter manuscripts
-    filtered_manuscripts = filter_manuscripts(manuscripts, filters)
-    total_filtered = len(filtered_manuscripts)
+    st.sidebar.metric("Total Manuscripts", len(filtered_dois))
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def render_checklist_html(uri: str, filtered_dois: tuple, data_version: tuple) -> str:
+    """Render the checklist statistics for the filtered manuscripts to HTML.
+    
+    The result is shared across reruns and sessions; data_version is only
+    part of the cache key so that database writes invalidate it.
+    """
+    db_service = get_db_service(uri)
+    
+    # Get grouped checklist items (cached across reruns)
+    checklist_groups = load_checklist_groups(uri)
+    
+    # Get compliance and feedback counts per item for filtered manuscripts in one aggregation
+    counts_by_item = db_service.get_checklist_stats(filtered_dois)
+    compliance_stats = build_compliance_stats(counts_by_item)
+    
+    # Collect table rows for all categories into a single DataFrame
+    data = []
+    for category, items_by_original in checklist_groups.items():
+        for original, grouped_items in items_by_original.items():
+            # Items are already in item_id order from the database query
+            for item in grouped_items:
+                item_id = item.get('item_id', '')
+                
+                if item_id in compliance_stats.index:
+                    stats = compliance_stats.loc[item_id]
+                    
+                    # Format row data
+                    row = {
+                        "category": category,
+                        "original": original,
+                        "Item": item.get('question', ''),
+                        "N": stats['N'],
+                        "Yes": stats['Yes'],
+                        "No": stats['No'],
+                        "Partial": stats['Partial'],
+                        "N/A": stats['n/a'],
+                        "Compliance": stats['Compliance'],
+                        "AI Accuracy": stats['Accuracy']
+                    }
+                    data.append(row)
+    
+    df = pd.DataFrame(data, columns=[
+        "category", "original", "Item", "N", "Yes", "No", "Partial", "N/A", "Compliance", "AI Accuracy"
+    ])
+    
+    # Row lookups upcast to float, so restore the integer count column
+    df["N"] = df["N"].astype(int)
+    
+    # Format the percentage columns for all rows at once
+    for col in ['Yes', 'No', 'Partial', 'N/A']:
+        df[col] = df[col].astype(int).astype(str) + '%'
+    
+    # Color the Compliance and AI Accuracy columns for all rows at once
+    for col in ['Compliance', 'AI Accuracy']:
+        df[col] = color_scores(df[col])
+    
+    # Build the <tr> of every row at once, then join the rows of each group
+    table_columns = ["Item", "N", "Yes", "No", "Partial", "N/A", "Compliance", "AI Accuracy"]
+    df["Item"] = df["Item"].map(escape)
+    row_html = "<tr>"
+    for col in table_columns:
+        row_html = row_html + "<td>" + df[col].astype(str) + "</td>"
+    rows_by_group = (row_html + "</tr>").groupby([df["category"], df["original"]], sort=False).agg("".join)
+    
+    table_header = "".join(f"<th>{col}</th>" for col in table_columns)
+    
+    # Build the HTML for all categories and render it in one call
+    html_parts = []
+    for i, (category, items_by_original) in enumerate(checklist_groups.items(), 1):
+        html_parts.append(f"<h3>{i}. {escape(category)}</h3>")
+        
+        for original in items_by_original:
+            # Show original text first
+            html_parts.append(f"<p><em>{escape(original)}</em></p>")
+            
+            rows = rows_by_group.get((category, original))
+            if rows is not None:
+                html_parts.append(
+                    f'<table class="checklist-table dataframe"><thead><tr>{table_header}</tr></thead>'
+                    f'<tbody>{rows}</tbody></table>'
+                )
+            
+            html_parts.append("<hr>")  # Separator between groups
     
-    st.sidebar.metric("Total Manuscripts", total_filtered)
+    return "\n".join(html_parts)
+
 
-def display_checklist_items(db_service: DatabaseService):
+def display_checklist_items(uri: str):
     """Display the checklist view."""
     
     st.markdown("""
@@ -95,173 +205,22 @@ def display_checklist_items(db_service: DatabaseService):
         </div>
     """, unsafe_allow_html=True)
     
-    # Get checklist items and all manuscripts from database
-    checklist_items = db_service.get_checklist_items()
-    all_manuscripts = db_service.get_all_manuscripts()
+    # Get the filterable manuscript fields (cached across reruns)
+    manuscripts = load_manuscript_frame(uri)
+    data_version = get_data_version()
     
     # Display filters in sidebar and get filter settings
-    filters = display_filter_sidebar(all_manuscripts)
+    filters = display_filter_sidebar(get_filter_options(uri, data_version))
+    
+    # Filter manuscripts once for the summary and the statistics
+    filtered_dois = filter_manuscript_dois(manuscripts, filters)
     
     # Display summary statistics
-    display_stats_summary(all_manuscripts, filters)
-    
-    # Get all compliance results and feedback for statistics
-    all_results = {}
-    
-    # Get all feedback in a single query
-    all_feedback = db_service.get_all_feedback_by_item()
-    
-    # Filter manuscripts based on criteria
-    filtered_manuscripts = filter_manuscripts(all_manuscripts, filters)
-    
-    # Get all compliance results for filtered manuscripts
-    for manuscript in filtered_manuscripts:
-        results = db_service.get_compliance_results(manuscript.doi)
-        for result in results:
-            if result.item_id not in all_results:
-                all_results[result.item_id] = []
-            all_results[result.item_id].append(result)
-    
-    if checklist_items:
-        # First group by category while maintaining order
-        items_by_category = {}
-        category_order = []
-        for item in checklist_items:
-            category = item.get('category', 'Uncategorized')
-            if category not in items_by_category:
-                items_by_category[category] = []
-                category_order.append(category)
-            items_by_category[category].append(item)
-        
-        # Display items by category in database order
-        for i, category in enumerate(dict.fromkeys(category_order), 1):
-            items = items_by_category[category]
-            st.subheader(f"{i}. {category}")
-            
-            # Group items by original text
-            items_by_original = {}
-            for item in items:
-                original = item.get('original', '')
-                if original not in items_by_original:
-                    items_by_original[original] = []
-                items_by_original[original].append(item)
-            
-            # Display grouped items
-            for original, grouped_items in items_by_original.items():
-                # Show original text first
-                st.markdown(f"*{original}*")
-                st.write("")  # Add some spacing
-                
-                # Create table data for items
-                data = []
-                for item in sorted(grouped_items, key=lambda x: x.get('item_id', '')):
-                    item_id = item.get('item_id', '')
-                    compliances = all_results.get(item_id, [])
-                    total_results = len(compliances)
-                    
-                    if total_results > 0:
-                        # Count compliance types
-                        compliances_dict = {"Yes": 0, "No": 0, "Partial": 0, "n/a": 0}
-                        for result in compliances:
-                            compliances_dict[result.compliance] += 1
-                            
-                        # Calculate statistics
-                        compliance_score = calculate_compliance_score([r.compliance for r in compliances])
-                        accuracy = calculate_accuracy(compliances, all_feedback.get(item_id, []))
-                        
-                        # Format row data
-                        row = {
-                            "Item": item.get('question', ''),
-                            "N": total_results,
-                            "Yes": f"{int(compliances_dict['Yes']/total_results*100)}%",
-                            "No": f"{int(compliances_dict['No']/total_results*100)}%",
-                            "Partial": f"{int(compliances_dict['Partial']/total_results*100)}%",
-                            "N/A": f"{int(compliances_dict['n/a']/total_results*100)}%",
-                            "Compliance": f"{calculate_compliance_score([r.compliance for r in compliances])}%",
-                            "AI Accuracy": f"{int(accuracy)}%" if accuracy is not None else "N/A"
-                        }
-                        data.append(row)
-                
-                if data:
-                    df = pd.DataFrame(data)
-                    
-                    # Add custom table styling
-                    st.markdown(
-                        """
-                        <style>
-                        .custom-table {
-                            width: 100%;
-                            table-layout: fixed;
-                        }
-                        .custom-table td:first-child {
-                            width: 40% !important;
-                            white-space: normal;
-                            text-align: left !important;
-                            padding-right: 15px;
-                        }
-                        .custom-table td:not(:first-child) {
-                            width: 10% !important;
-                            text-align: center !important;
-                            vertical-align: top;
-                        }
-                        .custom-table th {
-                            text-align: center !important;
-                            background-color: #f0f2f6;
-                            padding: 8px !important;
-                        }
-                        .custom-table th:first-child {
-                            text-align: left !important;
-                            width: 40% !important;
-                        }
-                        .custom-table th:not(:first-child) {
-                            width: 10% !important;
-                        }
-                        .score-high {
-                            color: #2ecc71 !important;
-                            font-weight: bold;
-                        }
-                        .score-medium {
-                            color: #f39c12 !important;
-                            font-weight: bold;
-                        }
-                        .score-low {
-                            color: #e74c3c !important;
-                            font-weight: bold;
-                        }
-                        .score-na {
-                            color: #95a5a6 !important;
-                            font-weight: bold;
-                        }
-                        </style>
-                        """,
-                        unsafe_allow_html=True
-                    )
-                    
-                    # Color the compliance scores
-                    def color_score(val):
-                        if val == "N/A":
-                            return f'<span class="score-na">{val}</span>'
-                        try:
-                            score = float(val.rstrip('%'))
-                            if score >= 80:
-                                return f'<span class="score-high">{val}</span>'
-                            elif score >= 50:
-                                return f'<span class="score-medium">{val}</span>'
-                            else:
-                                return f'<span class="score-low">{val}</span>'
-                        except ValueError:
-                            return f'<span class="score-na">{val}</span>'
-
-                    # Apply coloring only to Compliance and AI Accuracy columns
-                    for col in ['Compliance', 'AI Accuracy']:
-                        if col in df.columns:
-                            df[col] = df[col].apply(color_score)
-                    
-                    # Convert DataFrame to HTML with the custom class
-                    html = df.to_html(classes=['custom-table', 'dataframe'], index=False, escape=False)
-                    st.markdown(html, unsafe_allow_html=True)
-                
-                st.write("---")  # Separator between groups
+    display_stats_summary(filtered_dois)
+    
+    # Rendered HTML is only rebuilt when the filters or the data changed
+    html = render_checklist_html(uri, tuple(filtered_dois), data_version)
+    st.markdown(html, unsafe_allow_html=True)
 
 def main():
     """Main function to run the app."""
@@ -273,8 +232,9 @@ def main():
     
     load_css()
     
-    # Initialize database service
-    db_service = DatabaseService(st.secrets["MONGODB_URI"])
+    # Initialize database service (shared across reruns)
+    uri = st.secrets["MONGODB_URI"]
+    db_service = get_db_service(uri)
     
     st.title("✓ Checklists")
     st.markdown("""
@@ -285,7 +245,7 @@ View checklist overall stats and edit checklist items.
     tab1, tab2 = st.tabs(["View Checklist", "Manage Items"])
     
     with tab1:
-        display_checklist_items(db_service)
+        display_checklist_items(uri)
     
     with tab2:
         manage_checklist_items(db_service)
@@ -23,31 +23,56 @@ st.markdown("""
 View and edit system prompts used to analyze manuscripts and generate results.
 """)
 
+@st.cache_data(ttl=30, show_spinner=False)
+def load_prompts(prompts_dir: str) -> list:
+    """Read all prompt files with their file info.
+    
+    Args:
+        prompts_dir: Directory containing the .txt prompt files
+        
+    Returns:
+        List of dictionaries with name, stem, content, mtime, size and error
+        (set instead of content when the file could not be read), sorted by name
+    """
+    with os.scandir(prompts_dir) as it:
+        entries = sorted((e for e in it if e.name.endswith('.txt')), key=lambda e: e.name)
+    
+    prompts = []
+    for entry in entries:
+        prompt = {"name": entry.name, "stem": Path(entry.name).stem}
+        try:
+            with open(entry.path, 'r', encoding='utf-8') as f:
+                prompt["content"] = f.read()
+            # DirEntry caches the stat result
+            file_stat = entry.stat()
+            prompt["mtime"] = file_stat.st_mtime
+            prompt["size"] = file_stat.st_size
+        except Exception as e:
+            prompt["error"] = str(e)
+        prompts.append(prompt)
+    return prompts
+
 # Get all prompt files
-prompts_dir = Path('app/prompts')
-prompt_files = sorted(prompts_dir.glob('*.txt'))
+prompts = load_prompts('app/prompts')
 
 # Create tabs for each prompt
-tabs = st.tabs([f.stem.replace('_', ' ').title() for f in prompt_files])
+tabs = st.tabs([p["stem"].replace('_', ' ').title() for p in prompts])
 
 # Display each prompt in its own tab
-for tab, prompt_file in zip(tabs, prompt_files):
+for tab, prompt in zip(tabs, prompts):
     with tab:
-        st.markdown(f"### {prompt_file.stem.replace('_', ' ').title()}")
+        st.markdown(f"### {prompt['stem'].replace('_', ' ').title()}")
         
-        # Read and display prompt content
-        try:
-            with open(prompt_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                st.code(content, language='text')
-                
-            # Add file info
-            file_stat = os.stat(prompt_file)
-            st.caption(f"""
-            **File**: `{prompt_file.name}`  
-            **Last modified**: {datetime.fromtimestamp(file_stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')}  
-            **Size**: {file_stat.st_size:,} bytes
-            """)
-            
-        except Exception as e:
-            st.error(f"Error reading prompt file {prompt_file.name}: {str(e)}")
+        if "error" in prompt:
+            st.error(f"Error reading prompt file {prompt['name']}: {prompt['error']}")
+            continue
+        
+        # Display prompt content
+        st.code(prompt["content"], language='text')
+        
+        # Add file info
+        st.caption(f"""
+        **File**: `{prompt['name']}`  
+        **Last modified**: {datetime.fromtimestamp(prompt['mtime']).strftime('%Y-%m-%d %H:%M:%S')}  
+        **Size**: {prompt['size']:,} bytes
+        """)
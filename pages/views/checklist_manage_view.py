@@ -9,25 +9,100 @@ Author: ReproAI Team
 
 import streamlit as st
 from app.services.db_service import DatabaseService
+from app.services.cache_service import clear_checklist_cache, load_checklist_index
+
+def _toggle_adding_new_item():
+    """Switch between adding a new item and editing an existing one."""
+    st.session_state.adding_new_item = not st.session_state.adding_new_item
+
+def _cancel_adding_new_item():
+    """Leave the add item form without saving."""
+    st.session_state.adding_new_item = False
+
+def _set_message(level: str, text: str):
+    """Store a message to show with the form after the rerun."""
+    st.session_state.checklist_item_message = (level, text)
+
+def _show_message():
+    """Show the message stored by the last form submit, if any."""
+    message = st.session_state.pop('checklist_item_message', None)
+    if message:
+        level, text = message
+        if level == "error":
+            st.error(text)
+        else:
+            st.success(text)
+
+def _add_item(db_service: DatabaseService, category: str, original: str):
+    """Save the submitted add item form.
+    
+    Runs as the submit button callback, before the rerun triggered by the
+    submit, so the page is rendered once with the saved item.
+    """
+    item_text = st.session_state.new_item_question
+    description = st.session_state.new_item_description
+    section = st.session_state.new_item_section
+    
+    if not all([category, item_text, section]):
+        _set_message("error", "Please fill in all required fields")
+        return
+    
+    try:
+        new_item = {
+            "category": category,
+            "original": original,
+            "question": item_text,
+            "description": description,
+            "section": section
+        }
+        db_service.save_checklist_item(new_item)
+        clear_checklist_cache()
+        _set_message("success", "New item added successfully!")
+        st.session_state.adding_new_item = False
+        
+        # Clear the form only once the item is saved, so rejected input is kept
+        for key in ("new_item_question", "new_item_description", "new_item_section"):
+            st.session_state.pop(key, None)
+    except Exception as e:
+        _set_message("error", f"Error adding item: {str(e)}")
+
+def _update_item(db_service: DatabaseService, item_id: str, category: str, original: str):
+    """Save the submitted edit item form.
+    
+    Runs as the submit button callback, like _add_item.
+    """
+    item_text = st.session_state[f"edit_item_question_{item_id}"]
+    description = st.session_state[f"edit_item_description_{item_id}"]
+    section = st.session_state[f"edit_item_section_{item_id}"]
+    
+    if not all([category, item_text, section]):
+        _set_message("error", "Please fill in all required fields")
+        return
+    
+    try:
+        updated_item = {
+            "item_id": item_id,
+            "category": category,
+            "original": original,
+            "question": item_text,
+            "description": description,
+            "section": section
+        }
+        db_service.update_checklist_item(updated_item)
+        clear_checklist_cache()
+        _set_message("success", "Item updated successfully!")
+    except Exception as e:
+        _set_message("error", f"Error updating item: {str(e)}")
 
 def manage_checklist_items(db_service: DatabaseService):
     """Form to add or edit checklist items."""
     st.markdown('<h2 class="section-title">Manage Checklist Items</h2>', unsafe_allow_html=True)
     
-    # Get existing categories and items
-    checklist_items = db_service.get_checklist_items()
-    categories = sorted(list(set(item.get('category', '') for item in checklist_items if item.get('category'))))
-    sections = sorted(list(set(item.get('section', '') for item in checklist_items if item.get('section'))))
-    
-    items_by_category = {}
-    for item in checklist_items:
-        cat = item.get('category', '')
-        if cat not in items_by_category:
-            items_by_category[cat] = {
-                'original': item.get('original', ''),
-                'items': []
-            }
-        items_by_category[cat]['items'].append(item)
+    # Get existing categories and items (cached across reruns)
+    checklist_index = load_checklist_index(st.secrets["MONGODB_URI"])
+    categories = checklist_index['categories']
+    sections = checklist_index['sections']
+    items_by_category = checklist_index['items_by_category']
     
     # Initialize session state
     if 'adding_new_item' not in st.session_state:
@@ -39,7 +114,7 @@ def manage_checklist_items(db_service: DatabaseService):
     # Select item to edit if category is selected
     current_item = None
     if category and category in items_by_category:
-        items = sorted(items_by_category[category]['items'], key=lambda x: x.get('question', ''))
+        items = items_by_category[category]['items']
         selected_item = st.selectbox(
             "Select Item to Edit",
             options=items,
@@ -58,78 +133,64 @@ def manage_checklist_items(db_service: DatabaseService):
             st.markdown(f"*{original}*")
             st.write("---")
     
-    # Toggle for adding new item
+    # Toggle for adding new item (the callback runs before the rerun of the click)
     col1, col2 = st.columns([0.85, 0.15])
     with col2:
-        if st.button("Add New" if not st.session_state.adding_new_item else "Edit Existing", use_container_width=True):
-            st.session_state.adding_new_item = not st.session_state.adding_new_item
-            st.experimental_rerun()
+        st.button(
+            "Add New" if not st.session_state.adding_new_item else "Edit Existing",
+            on_click=_toggle_adding_new_item,
+            use_container_width=True
+        )
+    
+    _show_message()
     
     if st.session_state.adding_new_item:
         with st.form("add_item_form"):
             st.markdown('<h3 class="section-subtitle">Add New Item</h3>', unsafe_allow_html=True)
-            item_text = st.text_area("Item", height=100, help="The specific item to check")
-            description = st.text_area("Description", help="Detailed description of what this item checks for")
-            section = st.selectbox(
+            st.text_area("Item", height=100, key="new_item_question", help="The specific item to check")
+            st.text_area("Description", key="new_item_description", help="Detailed description of what this item checks for")
+            st.selectbox(
                 "Section",
                 [""] + sections,
+                key="new_item_section",
                 help="The section this item belongs to"
             )
             col1, col2 = st.columns(2)
-            submit = col1.form_submit_button("Add Item")
-            if col2.form_submit_button("Cancel"):
-                st.session_state.adding_new_item = False
-                st.experimental_rerun()
-            
-            if submit:
-                if not all([category, item_text, section]):
-                    st.error("Please fill in all required fields")
-                    return
-                
-                try:
-                    new_item = {
-                        "category": category,
-                        "original": original,
-                        "question": item_text,
-                        "description": description,
-                        "section": section
-                    }
-                    db_service.save_checklist_item(new_item)
-                    st.success("New item added successfully!")
-                    st.session_state.adding_new_item = False
-                    st.experimental_rerun()
-                except Exception as e:
-                    st.error(f"Error adding item: {str(e)}")
+            col1.form_submit_button(
+                "Add Item",
+                on_click=_add_item,
+                args=(db_service, category, original)
+            )
+            col2.form_submit_button("Cancel", on_click=_cancel_adding_new_item)
     
     else:  # Edit existing item
         if current_item:
+            item_id = current_item.get('item_id')
             with st.form("edit_item_form"):
                 st.markdown('<h3 class="section-subtitle">Edit Item</h3>', unsafe_allow_html=True)
-                item_text = st.text_area("Item", value=current_item.get('question', ''), height=100, help="The specific item to check")
-                description = st.text_area("Description", value=current_item.get('description', ''), help="Detailed description of what this item checks for")
-                section = st.selectbox(
+                st.text_area(
+                    "Item",
+                    value=current_item.get('question', ''),
+                    height=100,
+                    key=f"edit_item_question_{item_id}",
+                    help="The specific item to check"
+                )
+                st.text_area(
+                    "Description",
+                    value=current_item.get('description', ''),
+                    key=f"edit_item_description_{item_id}",
+                    help="Detailed description of what this item checks for"
+                )
+                st.selectbox(
                     "Section",
                     [""] + sections,
                     index=sections.index(current_item.get('section', '')) + 1 if current_item.get('section', '') in sections else 0,
+                    key=f"edit_item_section_{item_id}",
                     help="The section this item belongs to"
                 )
                 
-                if st.form_submit_button("Save Changes"):
-                    if not all([category, item_text, section]):
-                        st.error("Please fill in all required fields")
-                        return
-                    
-                    try:
-                        updated_item = {
-                            "item_id": current_item.get('item_id'),
-                            "category": category,
-                            "original": original,
-                            "question": item_text,
-                            "description": description,
-                            "section": section
-                        }
-                        db_service.update_checklist_item(updated_item)
-                        st.success("Item updated successfully!")
-                        st.experimental_rerun()
-                    except Exception as e:
-                        st.error(f"Error updating item: {str(e)}")
+                st.form_submit_button(
+                    "Save Changes",
+                    on_click=_update_item,
+                    args=(db_service, item_id, category, original)
+                )
@@ -6,14 +6,21 @@ This module provides statistical analysis functions for checklist items.
 
 Author: ReproAI Team
 """
-from datetime import datetime
-from typing import List, Dict, Optional, Any, Union
+from typing import List, Dict, Any
+import numpy as np
+import pandas as pd
 
-def filter_manuscripts(manuscripts: List[Any], filters: Dict[str, Any]) -> List[Any]:
-    """Filter manuscripts based on provided criteria.
+# Compliance values as stored in compliance results
+COMPLIANCE_VALUES = ["Yes", "No", "Partial", "n/a"]
+
+# Score weight of each compliance value ("n/a" is excluded from scoring)
+COMPLIANCE_SCORES = pd.Series({"Yes": 1.0, "No": 0.0, "Partial": 0.5})
+
+def filter_manuscript_dois(manuscripts: pd.DataFrame, filters: Dict[str, Any]) -> List[str]:
+    """Filter manuscripts based on provided criteria using boolean masks.
     
     Args:
-        manuscripts: List of manuscripts to filter
+        manuscripts: DataFrame with doi, discipline, design and processed_at columns
         filters: Dictionary of filter criteria:
             - discipline: Optional[str] - Filter by discipline
             - design: Optional[str] - Filter by study design
@@ -21,126 +28,93 @@ def filter_manuscripts(manuscripts: List[Any], filters: Dict[str, Any]) -> List[
             - processed_before: Optional[datetime] - Filter by processed_at date (before)
             
     Returns:
-        List[Any]: Filtered list of manuscripts
+        List[str]: DOIs of the matching manuscripts
     """
-    filtered = manuscripts
+    mask = pd.Series(True, index=manuscripts.index)
     
     if filters.get('discipline'):
-        filtered = [m for m in filtered if m.discipline == filters['discipline']]
+        mask &= manuscripts['discipline'] == filters['discipline']
         
     if filters.get('design'):
-        filtered = [m for m in filtered if m.design == filters['design']]
+        mask &= manuscripts['design'] == filters['design']
         
     if filters.get('processed_after'):
-        filtered = [m for m in filtered if m.processed_at and m.processed_at >= filters['processed_after']]
+        mask &= manuscripts['processed_at'] >= filters['processed_after']
         
     if filters.get('processed_before'):
-        filtered = [m for m in filtered if m.processed_at and m.processed_at <= filters['processed_before']]
+        mask &= manuscripts['processed_at'] <= filters['processed_before']
         
-    return filtered
+    return manuscripts.loc[mask, 'doi'].tolist()
 
-def get_unique_values(manuscripts: List[Any], field: str) -> List[str]:
-    """Get list of unique values for a given field in manuscripts.
+def get_unique_column_values(manuscripts: pd.DataFrame, field: str) -> List[str]:
+    """Get list of unique values for a given column of a manuscripts DataFrame.
     
     Args:
-        manuscripts: List of manuscripts
-        field: Field name to get unique values for
+        manuscripts: DataFrame of manuscript fields
+        field: Column name to get unique values for
         
     Returns:
-        List[str]: List of unique values
+        List[str]: Sorted list of unique non-empty values
     """
-    values = set()
-    for m in manuscripts:
-        value = getattr(m, field, None)
-        if value:
-            values.add(value)
-    return sorted(list(values))
+    values = manuscripts[field].dropna()
+    return sorted(values[values != ''].unique())
 
-def calculate_compliance_score(compliances: list, filters: Optional[Dict[str, Any]] = None) -> float:
-    """Calculate compliance score from a list of compliance values.
+def calculate_compliance_scores(counts: pd.DataFrame) -> pd.Series:
+    """Calculate compliance scores for many items at once.
     
     Args:
-        compliances: List of compliance values
-        filters: Optional dictionary of filter criteria
+        counts: Compliance counts with one row per item and a column per
+            compliance value
         
     Returns:
-        float: Compliance score percentage
+        pd.Series: Compliance score percentage per row
     """
-    scores = {
-        "Yes": 1.0,
-        "No": 0.0,
-        "Partial": 0.5,
-        "n/a": None
-    }
-    valid_scores = [scores[c] for c in compliances if scores[c] is not None]
-    return int(round(sum(valid_scores) / len(valid_scores) * 100)) if valid_scores else 0
-
-def format_compliance_status(status: str) -> str:
-    """Format compliance status with color."""
-    colors = {
-        "Yes": "#2ecc71",
-        "No": "#e74c3c",
-        "Partial": "#f1c40f",
-        "n/a": "#95a5a6"
-    }
-    return f"<span style='color: {colors[status]}'>{status}</span>"
+    scored = counts.reindex(columns=COMPLIANCE_SCORES.index, fill_value=0)
+    score = scored.dot(COMPLIANCE_SCORES).div(scored.sum(axis=1)).mul(100)
+    return score.round().fillna(0).astype(int)
 
-def calculate_accuracy(results: List[Any], feedback_list: List[Any], filters: Optional[Dict[str, Any]] = None) -> Optional[float]:
-    """Calculate accuracy of AI assessments based on user feedback.
+def build_compliance_stats(counts_by_item: Dict[str, Dict[str, Any]]) -> pd.DataFrame:
+    """Build per-item compliance statistics from compliance counts.
+    
+    All items are computed at once with vectorized pandas operations.
     
     Args:
-        results: List of compliance results
-        feedback_list: List of feedback for the item
-        filters: Optional dictionary of filter criteria
-        
+        counts_by_item: Compliance and feedback counts per item_id as
+            returned by DatabaseService.get_checklist_stats
+            
     Returns:
-        Optional[float]: Accuracy percentage or None if no reviewed items
+        pd.DataFrame: Statistics indexed by item_id with columns:
+            - N: Total number of results
+            - Yes, No, Partial, n/a: Percentage of results with that compliance
+            - Compliance: Compliance score percentage
+            - Accuracy: Percentage of reviewed results the user agreed with,
+              NaN if no results were reviewed
     """
-    # Filter results if filters provided
-    if filters:
-        results = filter_manuscripts(results, filters)
+    counts = pd.DataFrame.from_dict(counts_by_item, orient='index').reindex(
+        columns=COMPLIANCE_VALUES + ['total', 'reviewed', 'agreed'], fill_value=0
+    )
     
-    total_reviewed = 0
-    correct_assessments = 0
+    stats = counts[COMPLIANCE_VALUES].mul(100).floordiv(counts['total'], axis=0)
+    stats.insert(0, 'N', counts['total'])
+    stats['Compliance'] = calculate_compliance_scores(counts)
+    stats['Accuracy'] = counts['agreed'].mul(100).div(counts['reviewed'].where(counts['reviewed'] > 0)).floordiv(1)
     
-    # Create a map of feedback by DOI for faster lookup
-    feedback_by_doi = {f.doi: f for f in feedback_list}
-    
-    # Check each compliance result
-    for result in results:
-        feedback = feedback_by_doi.get(result.doi)
-        if not feedback or feedback.review_status == "skipped":
-            continue
-            
-        total_reviewed += 1
-        if feedback.review_status == "agreed":
-            correct_assessments += 1
-    
-    if total_reviewed == 0:
-        return None
-        
-    return (correct_assessments / total_reviewed) * 100
+    return stats
 
-def get_stats_by_field(manuscripts: List[Any], field: str, filters: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
-    """Get statistics grouped by a specific field.
+def color_scores(scores: pd.Series) -> pd.Series:
+    """Format score percentages as spans colored by score level.
     
     Args:
-        manuscripts: List of manuscripts
-        field: Field to group by (e.g., 'discipline', 'design')
-        filters: Optional dictionary of filter criteria
+        scores: Numeric score percentages, NaN where no score is available
         
     Returns:
-        Dict[str, int]: Count of manuscripts by field value
+        pd.Series: HTML spans with score-high/medium/low/na classes
     """
-    # Filter manuscripts if filters provided
-    if filters:
-        manuscripts = filter_manuscripts(manuscripts, filters)
-        
-    stats = {}
-    for m in manuscripts:
-        value = getattr(m, field, 'Unknown')
-        if not value:
-            value = 'Unknown'
-        stats[value] = stats.get(value, 0) + 1
-        
-    return dict(sorted(stats.items()))
+    scores = pd.to_numeric(scores, errors='coerce')
+    css_classes = np.select(
+        [scores >= 80, scores >= 50, scores.notna()],
+        ['score-high', 'score-medium', 'score-low'],
+        default='score-na'
+    )
+    labels = scores.map("{:.0f}%".format, na_action='ignore').fillna("N/A")
+    return '<span class="' + pd.Series(css_classes, index=scores.index) + '">' + labels + '</span>'
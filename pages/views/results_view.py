@@ -9,13 +9,24 @@ This module provides the detailed compliance analysis page for:
 """
 
 import streamlit as st
-import pandas as pd
+from collections import Counter
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from operator import attrgetter, itemgetter
+from typing import Dict, Any, List, Optional, Tuple
 import plotly.graph_objects as go
 import plotly.express as px
 from app.models.manuscript import Manuscript
+from app.models.compliance_result import ComplianceResult
 from app.models.feedback import Feedback
+from app.services.cache_service import (
+    CACHE_TTL,
+    get_data_version,
+    clear_feedback_cache,
+    load_checklist_items,
+    load_compliance_results,
+    load_summary,
+    load_feedback
+)
 
 # Define severity indicators and order (global variables)
 severity_colors = {
@@ -30,77 +41,55 @@ severity_order = {
     'LOW': 2,
     'UNKNOWN': 3
 }
+compliance_colors = {
+    "Yes": "green",
+    "No": "red",
+    "Partial": "orange",
+    "n/a": "gray"
+}
+compliance_status_markdown = {
+    status: f":{color}[{status}]" for status, color in compliance_colors.items()
+}
+compliance_scores = {
+    "Yes": 1.0,
+    "No": 0.0,
+    "Partial": 0.5
+}
+feedback_icons = {
+    "agreed": "✅",
+    "disagreed": "❌",
+    "unsure": "❓"
+}
 
-def create_summary_chart(results: List[Dict[str, Any]]) -> go.Figure:
-    """Create summary chart of compliance results."""
-    # Count statuses
-    status_counts = {"Yes": 0, "No": 0, "Partial": 0, "n/a": 0}
-    for result in results:
-        status_counts[result["compliance"]] += 1
-    
-    # Colors for each status
-    colors = {
-        "Yes": "#2ecc71",
-        "No": "#e74c3c",
-        "Partial": "#f39c12",
-        "n/a": "#95a5a6"
-    }
-    
-    # Create horizontal bar chart
-    fig = go.Figure()
-    
-    # Add bars
-    y_position = 0
-    for status, count in status_counts.items():
-        if count > 0:  # Only show non-zero values
-            fig.add_trace(go.Bar(
-                x=[count],
-                y=[y_position],
-                orientation='h',
-                name=status,
-                marker_color=colors[status],
-                text=[f"{status}: {count}"],
-                textposition='auto',
-                hoverinfo='text',
-                showlegend=False
-            ))
-            y_position += 1
-    
-    # Update layout
-    fig.update_layout(
-        height=100,
-        margin=dict(l=0, r=0, t=0, b=0),
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        barmode='stack',
-        xaxis=dict(showticklabels=False, showgrid=False),
-        yaxis=dict(showticklabels=False, showgrid=False)
+# Statuses shown in the summary chart, in stacking order, and their colors
+summary_chart_colors = {"Yes": "#2ecc71", "No": "#e74c3c", "Partial": "#f1c40f"}
+
+def count_compliance_statuses(results: list) -> Tuple[int, ...]:
+    """Count the results of each status shown in the summary chart."""
+    # Handle both dict and ComplianceResult objects
+    counts = Counter(
+        result.compliance if hasattr(result, 'compliance') else result.get('compliance')
+        for result in results
     )
-    
-    return fig
+    return tuple(counts[status] for status in summary_chart_colors)
 
-def create_summary_chart(results: list) -> go.Figure:
-    """Create summary chart of compliance results."""
-    # Count compliance statuses
-    status_counts = {"Yes": 0, "No": 0, "Partial": 0}
-    for result in results:
-        # Handle both dict and ComplianceResult objects
-        compliance = result.compliance if hasattr(result, 'compliance') else result.get('compliance')
-        if compliance != "n/a":
-            status_counts[compliance] += 1
-            
+@st.cache_resource(show_spinner=False)
+def build_summary_chart(status_counts: Tuple[int, ...]) -> go.Figure:
+    """Build the summary chart for the given status counts.
+    
+    Cached on the counts, so reruns with unchanged results reuse the figure.
+    """
     # Create horizontal bar chart
     fig = go.Figure()
     
     # Add bars for each status
-    colors = {"Yes": "#2ecc71", "No": "#e74c3c", "Partial": "#f1c40f"}
-    for status, count in status_counts.items():
+    for (status, color), count in zip(summary_chart_colors.items(), status_counts):
         fig.add_trace(go.Bar(
             name=status,
             y=[1],
             x=[count],
             orientation='h',
-            marker=dict(color=colors[status]),
+            marker=dict(color=color),
             text=[f"{status}: {count}"],
             hoverinfo='text',
             hovertemplate='%{text}'
@@ -120,95 +109,112 @@ def create_summary_chart(results: list) -> go.Figure:
     
     return fig
 
+def create_summary_chart(results: list) -> go.Figure:
+    """Create summary chart of compliance results."""
+    return build_summary_chart(count_compliance_statuses(results))
+
 def format_compliance_status(status: str) -> str:
     """Format compliance status with color."""
-    colors = {
-        "Yes": "green",
-        "No": "red",
-        "Partial": "orange",
-        "n/a": "gray"
-    }
-    color = colors.get(status, "gray")
-    return f":{color}[{status}]"
+    return compliance_status_markdown.get(status) or f":gray[{status}]"
+
+def score_from_status_counts(status_counts: Tuple[int, ...]) -> int:
+    """Calculate overall compliance score from the summary chart status counts."""
+    total = sum(status_counts)
+    if not total:
+        return 0
+    weighted = sum(
+        compliance_scores[status] * count
+        for status, count in zip(summary_chart_colors, status_counts)
+    )
+    return int(round(weighted / total * 100))
 
 def calculate_compliance_score(results: List[Dict[str, Any]]) -> float:
     """Calculate overall compliance score."""
-    scores = {
-        "Yes": 1.0,
-        "No": 0.0,
-        "Partial": 0.5
-    }
-    valid_scores = [scores[r["compliance"]] for r in results if r["compliance"] != "n/a"]
-    return int(round(sum(valid_scores) / len(valid_scores) * 100)) if valid_scores else 0
+    return score_from_status_counts(count_compliance_statuses(results))
+
+def format_ai_analysis(result: ComplianceResult) -> str:
+    """Format the AI analysis of a compliance result as markdown."""
+    lines = [
+        "##### AI Analysis",
+        f"**Status:** {format_compliance_status(result.compliance)}"
+    ]
+    if result.explanation:
+        lines.append(f"**Explanation:** {result.explanation}")
+    if result.quote:
+        lines.append(f"**Quote:** _{result.quote}_")
+    if result.section:
+        lines.append(f"**Section in text:** {result.section}")
+    return "\n\n".join(lines)
+
+def save_item_feedback(db_service, doi: str, item_id: str, review_status: str):
+    """Save the feedback entered for a compliance result.
+    
+    Runs as the callback of the feedback buttons, before the rerun
+    triggered by the click, so the page is rendered once with the saved
+    feedback instead of once before and once after saving.
+    """
+    rating = st.session_state.get(f"rating_{item_id}") if review_status == "disagreed" else None
+    if review_status == "disagreed" and not rating:
+        st.session_state[f"feedback_error_{item_id}"] = "Please select your rating before disagreeing"
+        return
+    
+    feedback = Feedback(
+        doi=doi,
+        item_id=item_id,
+        rating=rating,
+        review_status=review_status,
+        comments=st.session_state.get(f"comments_{item_id}", ""),
+        user_email=st.session_state.user_email
+    )
+    db_service.save_feedback(feedback)
+    clear_feedback_cache()
+    st.session_state[f"change_feedback_{item_id}"] = False
+
+def change_item_feedback(item_id: str):
+    """Reopen the feedback form of a compliance result."""
+    st.session_state[f"change_feedback_{item_id}"] = True
 
 def display_feedback_ui(db_service, result, manuscript, existing_feedback=None):
-    """Display the feedback UI for a compliance result."""
-    # Get existing feedback
-    if existing_feedback is None:
-        existing_feedback = db_service.get_feedback(manuscript.doi, result["item_id"], user_email=st.session_state.user_email)
+    """Display the feedback UI for a compliance result.
     
+    existing_feedback is the user's feedback on the item, loaded for all
+    items at once by the caller (None if there is none yet).
+    """
     # If no feedback exists or user wants to change
-    if not existing_feedback or st.session_state.get(f"change_feedback_{result['item_id']}", False):
-        comments = st.text_area(
+    if not existing_feedback or st.session_state.get(f"change_feedback_{result.item_id}", False):
+        st.text_area(
             "Your explanation (optional)",
             value=existing_feedback.comments if existing_feedback else "",
-            key=f"comments_{result['item_id']}"
+            key=f"comments_{result.item_id}"
         )
         
         # Show rating options
-        rating = st.radio(
+        st.radio(
             "If you disagree, please provide your rating",
             ["Yes", "No", "Partial", "N/A"],
-            key=f"rating_{result['item_id']}",
+            key=f"rating_{result.item_id}",
             index=None  # No default selection
         )
         
         # Action buttons
         col1, col2, col3 = st.columns(3)
-
-        with col1:
-            if st.button("❌ Disagree", key=f"disagree_{result['item_id']}"):
-                if not rating:
-                    st.error("Please select your rating before disagreeing")
-                else:
-                    feedback = Feedback(
-                        doi=manuscript.doi,
-                        item_id=result["item_id"],
-                        rating=rating,
-                        review_status="disagreed",
-                        comments=comments,
-                        user_email=st.session_state.user_email
-                    )
-                    db_service.save_feedback(feedback)
-                    st.session_state[f"change_feedback_{result['item_id']}"] = False
-                    st.rerun()
-
+        buttons = (
+            (col1, "❌ Disagree", "disagree", "disagreed"),
+            (col2, "✅ Agree", "agree", "agreed"),
+            (col3, "❓ Unsure", "unsure", "unsure")
+        )
+        for col, label, key_prefix, review_status in buttons:
+            col.button(
+                label,
+                key=f"{key_prefix}_{result.item_id}",
+                on_click=save_item_feedback,
+                args=(db_service, manuscript.doi, result.item_id, review_status)
+            )
         
-        with col2:
-            if st.button("✅ Agree", key=f"agree_{result['item_id']}"):
-                feedback = Feedback(
-                    doi=manuscript.doi,
-                    item_id=result["item_id"],
-                    review_status="agreed",
-                    comments=comments,
-                    user_email=st.session_state.user_email
-                )
-                db_service.save_feedback(feedback)
-                st.session_state[f"change_feedback_{result['item_id']}"] = False
-                st.rerun()
-                               
-        with col3:
-            if st.button("❓ Unsure", key=f"unsure_{result['item_id']}"):
-                feedback = Feedback(
-                    doi=manuscript.doi,
-                    item_id=result["item_id"],
-                    review_status="unsure",
-                    comments=comments,
-                    user_email=st.session_state.user_email
-                )
-                db_service.save_feedback(feedback)
-                st.session_state[f"change_feedback_{result['item_id']}"] = False
-                st.rerun()
+        # Show the error of the last click, if any
+        error = st.session_state.pop(f"feedback_error_{result.item_id}", None)
+        if error:
+            st.error(error)
     
     # Show existing feedback
     else:
@@ -226,132 +232,132 @@ def display_feedback_ui(db_service, result, manuscript, existing_feedback=None):
         if existing_feedback.comments:
             st.markdown(f"_Comment: {existing_feedback.comments}_")
         
-        if st.button("Change", key=f"change_{result['item_id']}"):
-            st.session_state[f"change_feedback_{result['item_id']}"] = True
-            st.rerun()
+        st.button("Change", key=f"change_{result.item_id}", on_click=change_item_feedback, args=(result.item_id,))
 
-def display_compliance_results(results: List[Dict[str, Any]], checklist_items: List[Dict[str, Any]], manuscript):
-    """Display compliance results in an interactive table."""
-    if not results:
-        st.warning("No compliance results found for this manuscript.")
-        return
-        
-    # Convert ComplianceResult objects to dictionaries if needed
-    results_data = []
-    for result in results:
-        if hasattr(result, '__dict__'):
-            results_data.append({
-                'item_id': result.item_id,
-                'compliance': result.compliance,
-                'explanation': result.explanation,
-                'quote': result.quote,
-                'section': result.section,
-                'created_at': result.created_at,
-                'question': result.question
-            })
-        else:
-            results_data.append(result)
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def group_results_by_category(uri: str, doi: str, data_version: tuple) -> Dict[str, Tuple[str, List[ComplianceResult]]]:
+    """Group the compliance results of a manuscript by checklist category.
     
-    # Create a lookup for checklist items
-    checklist_lookup = {item["item_id"]: item for item in checklist_items}
+    Cached so the grouping is only redone after the data changed;
+    data_version is only part of the cache key.
     
-    # Get all feedback for this manuscript and user
-    user_email = st.session_state.get("user_email")
-    manuscript_feedback = {
-        feedback.item_id: feedback 
-        for feedback in st.session_state.db_service.get_all_feedback(manuscript.doi, user_email=user_email)
-    }
+    Returns:
+        Dictionary mapping category to a tuple of (severity indicator,
+        results), ordered by severity
+    """
+    # Create a lookup for checklist items
+    checklist_lookup = {item["item_id"]: item for item in load_checklist_items(uri)}
     
     # Group results by category
     results_by_category = {}
-    for result in results_data:
-        item = checklist_lookup.get(result['item_id'])
+    for result in load_compliance_results(uri, doi):
+        item = checklist_lookup.get(result.item_id)
         if item:
             category = item.get('category', 'Uncategorized')
-            if category not in results_by_category:
-                results_by_category[category] = []
-            results_by_category[category].append(result)
+            results_by_category.setdefault(category, []).append(result)
     
     # Get severity from summary if available
-    summary = st.session_state.db_service.get_summary(manuscript.doi)
+    summary = load_summary(uri, doi)
     category_severity = {}
     if summary:
         for cat in summary.get('category_summaries', []):
             category_severity[cat['category']] = cat['severity'].upper()
     
-    # Sort categories by severity
-    sorted_categories = sorted(
-        results_by_category.keys(),
-        key=lambda x: severity_order.get(category_severity.get(x, 'UNKNOWN'), 4)
-    )
+    # Sort categories by severity, resolving each severity once
+    ranked = []
+    for category, category_results in results_by_category.items():
+        severity = category_severity.get(category, 'UNKNOWN')
+        ranked.append((severity_order.get(severity, 4), category, severity_colors.get(severity, ''), category_results))
+    ranked.sort(key=itemgetter(0))
+    
+    return {category: (indicator, category_results) for _, category, indicator, category_results in ranked}
+
+def display_compliance_results(results: List[ComplianceResult], manuscript):
+    """Display compliance results in an interactive table."""
+    if not results:
+        st.warning("No compliance results found for this manuscript.")
+        return
+    
+    uri = st.secrets["MONGODB_URI"]
+    
+    # Get the results grouped by category, sorted by severity
+    results_by_category = group_results_by_category(uri, manuscript.doi, get_data_version())
+    if not results_by_category:
+        st.warning("None of the compliance results match a current checklist item.")
+        return
+    
+    # Get all feedback for this manuscript and user
+    user_email = st.session_state.get("user_email")
+    manuscript_feedback = {
+        feedback.item_id: feedback 
+        for feedback in load_feedback(uri, manuscript.doi, user_email)
+    }
     
     # Display results by category
-    for category in sorted_categories:
-        severity = category_severity.get(category, 'UNKNOWN')
-        severity_indicator = severity_colors.get(severity, '')
-        category_results = results_by_category[category]
-        
+    for category, (severity_indicator, category_results) in results_by_category.items():
         # Count feedback statuses for this category
-        category_feedback = {
-            "agreed": "✅",
-            "disagreed": "❌",
-            "unsure": "❓"
-        }
-        feedback_counts = {status: 0 for status in category_feedback.keys()}
-        
-        for result in category_results:
-            feedback = manuscript_feedback.get(result['item_id'])
-            if feedback:
-                feedback_counts[feedback.review_status] += 1
+        feedback_counts = Counter(
+            feedback.review_status
+            for feedback in map(manuscript_feedback.get, (result.item_id for result in category_results))
+            if feedback
+        )
         
         # Create feedback status string with repeated icons
-        feedback_status = "".join([
-            icon * count for status, (icon, count) in 
-            ((s, (i, feedback_counts[s])) for s, i in category_feedback.items())
-            if count > 0
-        ])
+        feedback_status = "".join(icon * feedback_counts[status] for status, icon in feedback_icons.items())
         
-        # Create category expander with count and feedback status
-        with st.expander(f"{severity_indicator} {category} ({len(category_results)} items) {feedback_status}", expanded=False):
+        # Create category toggle with count and feedback status. Unlike the
+        # body of a collapsed st.expander, the items of a closed category are
+        # not rendered at all. The open state is kept under its own key, since
+        # the label (and so the widget) changes as feedback is given.
+        open_key = f"category_open_{category}"
+        is_open = st.toggle(
+            f"{severity_indicator} {category} ({len(category_results)} items) {feedback_status}",
+            value=st.session_state.get(open_key, False)
+        )
+        st.session_state[open_key] = is_open
+        if not is_open:
+            continue
+        
+        with st.container(border=True):
             # Display results in this category
-            for result in category_results:
-                # Get feedback status for this item
-                feedback = manuscript_feedback.get(result['item_id'])
-                feedback_icon = ""
-                if feedback:
-                    if feedback.review_status == "agreed":
-                        feedback_icon = "✅ "
-                    elif feedback.review_status == "disagreed":
-                        feedback_icon = "❌ "
-                    else:  # unsure
-                        feedback_icon = "❓ "
-                
-                # Show item header without compliance status
-                st.markdown(f"#### {result['item_id']}: {result['question']}")
+            for i, result in enumerate(category_results):
+                # Show item header without compliance status, preceded by the
+                # separator from the previous item in the same element
+                header = f"#### {result.item_id}: {result.question}"
+                st.markdown(f"---\n\n{header}" if i else header)
                 
                 # Create two columns
                 col1, col2 = st.columns(2)
                 
-                # Left column: AI Analysis
+                # Left column: AI Analysis, sent as a single markdown element
                 with col1:
-                    st.markdown("##### AI Analysis")
-                    st.markdown(f"**Status:** {format_compliance_status(result['compliance'])}")
-                    if result['explanation']:
-                        st.markdown(f"**Explanation:** {result['explanation']}")
-                    if result['quote']:
-                        st.markdown(f"**Quote:** _{result['quote']}_")
-                    if result['section']:
-                        st.markdown(f"**Section in text:** {result['section']}")
+                    st.markdown(format_ai_analysis(result))
                 
                 # Right column: Feedback
                 with col2:
                     st.markdown("##### Your feedback")
-                    display_feedback_ui(st.session_state.db_service, result, manuscript, manuscript_feedback.get(result['item_id']))
-                
-                # Add separator between items
-                st.markdown("---")
+                    display_feedback_ui(st.session_state.db_service, result, manuscript, manuscript_feedback.get(result.item_id))
 
 
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def render_category_summary_html(uri: str, doi: str, data_version: tuple) -> str:
+    """Render the category summaries of a manuscript as an HTML table.
+    
+    Cached like group_results_by_category; data_version is only part of
+    the cache key.
+    """
+    summary = load_summary(uri, doi) or {}
+    
+    rows = []
+    for cat in summary.get("category_summaries", []):
+        severity_indicator = severity_colors.get(cat['severity'].upper(), '')
+        rows.append(f"<tr><td>{severity_indicator} {cat['category']}</td><td>{cat['summary']}</td></tr>")
+    
+    return (
+        '<table class="custom-table dataframe"><thead><tr><th>Category</th><th>Summary</th></tr></thead>'
+        f'<tbody>{"".join(rows)}</tbody></table>'
+    )
+
 def compliance_analysis_page():
     """Main compliance analysis page."""
     
@@ -372,10 +378,10 @@ def compliance_analysis_page():
         st.error("Database service not initialized.")
         return
     
-    # Get results and checklist items
-    results = db_service.get_compliance_results(manuscript.doi)
-    checklist_items = db_service.get_checklist_items()
-    summary = db_service.get_summary(manuscript.doi)
+    # Get results and summary (cached across reruns)
+    uri = st.secrets["MONGODB_URI"]
+    results = load_compliance_results(uri, manuscript.doi)
+    summary = load_summary(uri, manuscript.doi)
     
     if not summary:
         st.warning("No summary found for this manuscript. Please process the manuscript first.")
@@ -396,27 +402,23 @@ def compliance_analysis_page():
             st.markdown(f"<p style='font-size: 14px;'><b>DOI:</b> {manuscript.doi}</p>", unsafe_allow_html=True)
         with doi_col2:
             # Get latest analysis date
-            latest_result = max(results, key=lambda x: x.created_at) if results else None
-            if latest_result and latest_result.created_at:
-                st.markdown(f"<p style='font-size: 14px; text-align: right;'><b>Analysis Date:</b> {latest_result.created_at.strftime('%Y-%m-%d %H:%M')}</p>", unsafe_allow_html=True)
+            latest_created_at = max(map(attrgetter('created_at'), results)) if results else None
+            if latest_created_at:
+                st.markdown(f"<p style='font-size: 14px; text-align: right;'><b>Analysis Date:</b> {latest_created_at.strftime('%Y-%m-%d %H:%M')}</p>", unsafe_allow_html=True)
     
     with table1_col2:
         # Calculate and display compliance score
         if results:
-            scores = {
-                "Yes": 1.0,
-                "No": 0.0,
-                "Partial": 0.5
-            }
-            valid_scores = [scores[r.compliance] for r in results if r.compliance != "n/a"]
-            compliance_score = int(round(sum(valid_scores) / len(valid_scores) * 100)) if valid_scores else 0
+            # Count the statuses once for both the chart and the score
+            status_counts = count_compliance_statuses(results)
+            compliance_score = score_from_status_counts(status_counts)
             
             # Create columns for score display
             score_col1, score_col2 = st.columns([2, 1])
             
             with score_col1:
                 # Show summary chart
-                st.plotly_chart(create_summary_chart(results), use_container_width=True)
+                st.plotly_chart(build_summary_chart(status_counts), use_container_width=True)
                 
             with score_col2:
                 # Show compliance score with large number
@@ -436,50 +438,9 @@ def compliance_analysis_page():
         # Display category summaries in a table
         st.markdown("### Summary by checklist category")
         
-        # Create DataFrame with category summaries
         if summary and "category_summaries" in summary:
-            data = []
-            for cat in summary["category_summaries"]:
-                severity = cat['severity'].upper()
-                severity_indicator = severity_colors.get(severity, '')
-                data.append({
-                    'Category': f"{severity_indicator} {cat['category']}",
-                    'Summary': cat['summary']
-                })
-            
-            df = pd.DataFrame(data)
-            
-            # Create a styled table with custom column widths
-            st.markdown(
-                """
-                <style>
-                .custom-table {
-                    width: 100%;
-                    table-layout: fixed;
-                }
-                .custom-table td:first-child {
-                    width: 30%;
-                    white-space: nowrap;
-                    text-align: left !important;
-                    padding-right: 15px;
-                }
-                .custom-table td:nth-child(2) {
-                    width: 70%;
-                }
-                .custom-table th {
-                    text-align: left !important;
-                }
-                .custom-table td {
-                    word-wrap: break-word;
-                    vertical-align: top;
-                }
-                </style>
-                """,
-                unsafe_allow_html=True
-            )
-            
-            # Convert DataFrame to HTML with the custom class
-            html = df.to_html(classes=['custom-table', 'dataframe'], index=False, escape=False)
+            # Rendered HTML is only rebuilt when the data changed
+            html = render_category_summary_html(uri, manuscript.doi, get_data_version())
             st.markdown(html, unsafe_allow_html=True)
     
     with table2_col2:
@@ -492,37 +453,40 @@ def compliance_analysis_page():
     
     # Add "Agree with all" button
     if st.button("I agree with all open items", use_container_width=True):
-        # Get all existing feedback
-        existing_feedback = {
-            f.item_id: f 
+        # Get the items that already have feedback
+        existing_ids = {
+            f.item_id
             for f in st.session_state.db_service.get_all_feedback(manuscript.doi)
         }
+        open_ids = [result.item_id for result in results if result.item_id not in existing_ids]
         
-        # Create "Agree" feedback for items without existing feedback
-        new_feedback = []
-        for result in results:
-            if result.item_id not in existing_feedback:
-                feedback = Feedback(
+        if not open_ids:
+            st.info("All items already have feedback.")
+        else:
+            # Create "Agree" feedback for items without existing feedback
+            created_at = datetime.now()
+            new_feedback = [
+                Feedback(
                     doi=manuscript.doi,
-                    item_id=result.item_id,
+                    item_id=item_id,
                     review_status="agreed",
                     rating=None,
                     comments="",
-                    created_at=datetime.now(),
+                    created_at=created_at,
                     user_email=st.session_state.user_email
                 )
-                new_feedback.append(feedback)
-        
-        # Save all new feedback
-        if new_feedback:
-            for feedback in new_feedback:
-                st.session_state.db_service.save_feedback(feedback)
+                for item_id in open_ids
+            ]
+            
+            # Save all new feedback
+            st.session_state.db_service.save_feedback_many(new_feedback)
+            clear_feedback_cache()
             st.success(f"Marked {len(new_feedback)} items as 'Agree'")
             # Force a page rerun to refresh all feedback
             st.rerun()
     
     # Display detailed results
-    display_compliance_results(results, checklist_items, manuscript)
+    display_compliance_results(results, manuscript)
 
 if __name__ == "__main__":
     st.set_page_config(page_title="Review", layout="wide")
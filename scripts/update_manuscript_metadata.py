@@ -5,17 +5,28 @@ Script to update existing manuscripts with missing discipline, study design, and
 import os
 import sys
 import json
-import time
+import asyncio
+import logging
+from itertools import islice
 from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Tuple
 
 # Add the parent directory to sys.path to import app modules
 parent_dir = str(Path(__file__).parent.parent)
 sys.path.append(parent_dir)
 
 from app.services.db_service import DatabaseService
-from app.services.llm_service import get_llm_response, truncate_to_token_limit, MAX_TOKENS_INPUT
+from app.services.llm_service import (
+    get_llm_response_async,
+    RateLimiter,
+    MAX_TOKENS_INPUT,
+    CHARS_PER_TOKEN
+)
 from app.models.manuscript import Manuscript
 
+logger = logging.getLogger(__name__)
+
 METADATA_PROMPT = """You are extracting metadata from a scientific manuscript.
 Return ONLY a valid JSON object with no additional text or formatting.
 
@@ -35,8 +46,54 @@ Important:
 - If a field cannot be determined, use an empty string
 """
 
-def update_manuscript_metadata(manuscript: Manuscript, text: str, db_service: DatabaseService) -> bool:
-    """Update a manuscript's metadata if discipline, design, or email is missing."""
+# Attempts after which a manuscript is no longer retried, and the minimum
+# time between attempts (some papers simply have no author email)
+MAX_METADATA_ATTEMPTS = 3
+METADATA_RETRY_INTERVAL = timedelta(hours=24)
+
+def missing_metadata_query(now: datetime) -> Dict[str, Any]:
+    """Build the filter for manuscripts whose metadata should be filled in.
+    
+    Matches manuscripts missing any of the fields this script fills in, with
+    text or an abstract to extract them from, and not given up on or tried
+    recently. "$not" also matches documents without the attempt fields.
+    """
+    return {
+        "$and": [
+            {"$or": [{field: {"$in": [None, ""]}} for field in ("discipline", "design", "email")]},
+            {"$or": [{field: {"$nin": [None, ""]}} for field in ("text", "abstract")]}
+        ],
+        "metadata_attempts": {"$not": {"$gte": MAX_METADATA_ATTEMPTS}},
+        "metadata_last_attempt_at": {"$not": {"$gte": now - METADATA_RETRY_INTERVAL}}
+    }
+
+# Fields read for each manuscript; the updates only $set fields, so the
+# rest of the document does not need to be loaded
+METADATA_PROJECTION = {
+    "_id": 0, "doi": 1, "discipline": 1, "design": 1, "email": 1, "abstract": 1, "text": 1
+}
+
+# Characters of manuscript text sent for metadata extraction
+METADATA_MAX_CHARS = (MAX_TOKENS_INPUT // 4) * CHARS_PER_TOKEN
+
+# Number of manuscripts read from the cursor and processed concurrently at a time
+PROCESS_BATCH_SIZE = 50
+
+async def update_manuscript_metadata(manuscript: Manuscript, text: str,
+                                     rate_limiter: RateLimiter) -> Dict[str, str]:
+    """Fill in a manuscript's metadata if discipline, design, or email is missing.
+    
+    The LLM call goes through the shared rate limiter, so several manuscripts
+    can be processed at once. Saving is left to the caller, which batches the
+    writes.
+    
+    Returns:
+        Dictionary of the fields that were filled in, empty if none
+        
+    Raises:
+        Exception: If the LLM call fails or its response cannot be parsed,
+            so the caller can count it as an error rather than an attempt
+    """
     needs_update = False
     
     # Check if any field is missing or empty
@@ -44,108 +101,123 @@ def update_manuscript_metadata(manuscript: Manuscript, text: str, db_service: Da
         needs_update = True
     
     if not needs_update:
-        return False
+        return {}
         
+    # Use the first part of the text if available, otherwise the abstract.
+    # As in MetadataExtractor, the opening pages (title page, abstract,
+    # design) are enough, so only ~25% of the input budget is sent
+    content_to_analyze = text[:METADATA_MAX_CHARS] if text else manuscript.abstract
+    if not content_to_analyze:
+        logger.debug("No text or abstract found for manuscript %s", manuscript.doi)
+        return {}
+    
+    # Call LLM to extract metadata
+    response = await get_llm_response_async(
+        prompt=content_to_analyze,
+        system_prompt=METADATA_PROMPT,
+        temperature=0.1,
+        response_format={"type": "json_object"},
+        rate_limiter=rate_limiter
+    )
+    
+    # Parse the response
+    metadata = json.loads(response)
+    
+    # Update only if fields are missing
+    changes = {}
+    for field in ("discipline", "design", "email"):
+        if not getattr(manuscript, field) and metadata.get(field):
+            changes[field] = metadata[field]
+            setattr(manuscript, field, metadata[field])
+    return changes
+
+async def process_manuscripts(manuscripts, total: int, db_service: DatabaseService) -> Tuple[int, int]:
+    """Update the metadata of the manuscripts, a batch at a time.
+    
+    Args:
+        manuscripts: Iterator of manuscripts to process
+        total: Number of manuscripts, for progress logging
+        db_service: Database service used to save the updates
+        
+    Returns:
+        Tuple of (updated count, error count)
+    """
+    # The rate limiter replaces a fixed delay between calls and shares one
+    # API client across them
+    rate_limiter = RateLimiter()
+    updated = 0
+    errors = 0
+    processed = 0
+    
     try:
-        # Use text if available, otherwise use abstract
-        content_to_analyze = text if text else manuscript.abstract
-        if not content_to_analyze:
-            print(f"No text or abstract found for manuscript {manuscript.doi}")
-            return False
+        while True:
+            batch = list(islice(manuscripts, PROCESS_BATCH_SIZE))
+            if not batch:
+                break
             
-        # Truncate text to fit token limit
-        content_to_analyze = truncate_to_token_limit(content_to_analyze, MAX_TOKENS_INPUT)
-        
-        # Call LLM to extract metadata
-        response = get_llm_response(
-            prompt=content_to_analyze,
-            system_prompt=METADATA_PROMPT,
-            temperature=0.1,
-            response_format={"type": "json_object"}
-        )
-        
-        # Parse the response
-        metadata = json.loads(response)
-        
-        # Update only if fields are missing
-        if not manuscript.discipline and metadata.get('discipline'):
-            manuscript.discipline = metadata['discipline']
-        if not manuscript.design and metadata.get('design'):
-            manuscript.design = metadata['design']
-        if not manuscript.email and metadata.get('email'):
-            manuscript.email = metadata['email']
+            outcomes = await asyncio.gather(
+                *(update_manuscript_metadata(m, m.text, rate_limiter) for m in batch),
+                return_exceptions=True
+            )
             
-        # Save the updated manuscript
-        db_service.save_manuscript(manuscript)
-        return True
-        
-    except Exception as e:
-        print(f"Error updating metadata for manuscript {manuscript.doi}: {str(e)}")
-        return False
+            # Record an attempt only on manuscripts the LLM gave a usable answer
+            # for, so outages and bad responses do not use up the attempts
+            attempted_at = datetime.now(timezone.utc)
+            pending = {}
+            for manuscript, outcome in zip(batch, outcomes):
+                processed += 1
+                if isinstance(outcome, Exception):
+                    logger.warning("Error processing manuscript %s: %s", manuscript.doi, outcome)
+                    errors += 1
+                    continue
+                
+                pending[manuscript.doi] = {**outcome, "metadata_last_attempt_at": attempted_at}
+                if outcome:
+                    logger.debug("Updated metadata of %s: %s", manuscript.doi, outcome)
+                    updated += 1
+                else:
+                    logger.debug("No new metadata found for %s", manuscript.doi)
+            
+            # Save the filled in fields and attempts of the whole batch in one round trip
+            db_service.update_manuscript_fields(pending, increments={"metadata_attempts": 1})
+            
+            # Report progress once per batch rather than once per manuscript
+            logger.info("Processed %d/%d manuscripts: %d updated, %d skipped, %d errors",
+                        processed, total, updated, processed - updated - errors, errors)
+    finally:
+        await rate_limiter.aclose()
+    
+    return updated, errors
 
 def main():
+    # llm_service configures the root logger on import, so replace its format
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s", force=True)
+    
     # Initialize Streamlit secrets (even though we're not running a Streamlit app)
     import streamlit as st
     
     # Get MongoDB URI from secrets
     mongodb_uri = st.secrets["MONGODB_URI"]
     if not mongodb_uri:
-        print("Error: MONGODB_URI not found in Streamlit secrets!")
+        logger.error("MONGODB_URI not found in Streamlit secrets!")
         sys.exit(1)
     
     # Initialize services
     db_service = DatabaseService(mongodb_uri)
     
-    # Get all manuscripts
-    manuscripts = db_service.get_all_manuscripts()
-    total = len(manuscripts)
-    updated = 0
-    errors = 0
-    skipped = 0
+    # Stream the manuscripts with missing metadata instead of loading them all
+    query = missing_metadata_query(datetime.now(timezone.utc))
+    total = db_service.count_manuscripts(query)
+    manuscripts = db_service.iter_manuscripts(
+        query, batch_size=PROCESS_BATCH_SIZE, projection=METADATA_PROJECTION
+    )
     
-    print(f"Found {total} manuscripts to process")
+    logger.info("Found %d manuscripts to process", total)
     
-    for i, manuscript in enumerate(manuscripts, 1):
-        print(f"\nProcessing manuscript {i}/{total}: {manuscript.doi}")
-        print(f"Current discipline: {manuscript.discipline}")
-        print(f"Current design: {manuscript.design}")
-        print(f"Current email: {manuscript.email}")
-        
-        # Skip if no text and no abstract
-        if (not hasattr(manuscript, 'text') or not manuscript.text) and not manuscript.abstract:
-            print(f"Skipping manuscript {manuscript.doi} - no text or abstract content")
-            skipped += 1
-            continue
-        
-        # Skip if all fields are already populated
-        if manuscript.discipline and manuscript.design and manuscript.email:
-            print("Skipping - all fields already set")
-            skipped += 1
-            continue
-            
-        try:
-            # Add delay to respect rate limits
-            time.sleep(1)
-            
-            # Update metadata
-            if update_manuscript_metadata(manuscript, manuscript.text if hasattr(manuscript, 'text') else None, db_service):
-                print(f"Updated metadata:")
-                print(f"New discipline: {manuscript.discipline}")
-                print(f"New design: {manuscript.design}")
-                print(f"New email: {manuscript.email}")
-                updated += 1
-            else:
-                print("No update needed or update failed")
-                
-        except Exception as e:
-            print(f"Error processing manuscript {manuscript.doi}: {str(e)}")
-            errors += 1
+    updated, errors = asyncio.run(process_manuscripts(manuscripts, total, db_service))
             
-    print(f"\nProcessing complete!")
-    print(f"Total manuscripts: {total}")
-    print(f"Successfully updated: {updated}")
-    print(f"Skipped (no content/already complete): {skipped}")
-    print(f"Errors: {errors}")
+    logger.info("Processing complete! Manuscripts with missing metadata: %d, "
+                "successfully updated: %d, errors: %d", total, updated, errors)
 
 if __name__ == "__main__":
     main()